@@ -0,0 +1,173 @@
+import os
+import threading
+
+import pygame
+
+# Размер блока и персонажей
+TILE_SIZE = (40, 40)
+COIN_SIZE = (20, 20)
+
+# Ширины платформ в блоках: случайные из генератора и стартовая
+PLATFORM_WIDTHS = (3, 4, 5, 19)
+
+# Событие о ходе фоновой загрузки: атрибуты done, total и error
+LOAD_PROGRESS = pygame.event.custom_type()
+
+
+# Менеджер ресурсов: каждая картинка загружается и конвертируется
+# в формат экрана один раз, а масштабированные и отзеркаленные
+# варианты хранятся в кэше под ключом (путь, размер, отражение).
+class AssetManager:
+    def __init__(self, root="."):
+        self.root = root
+        self.surfaces = {}
+        self.fonts = {}
+
+    # Перевод поверхности в формат экрана (если окно уже создано)
+    @staticmethod
+    def convert(surface):
+        if pygame.display.get_surface() is None:
+            return surface
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()  # Цветовой ключ сохраняется
+
+    def image(self, path, size=None, flip=False):
+        key = (path, size, flip)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            return surface
+
+        if flip:
+            surface = pygame.transform.flip(self.image(path, size), True, False)
+        else:
+            surface = pygame.image.load(os.path.join(self.root, path))
+            if size is not None:
+                surface = pygame.transform.scale(surface, size)
+            surface = self.convert(surface)
+        self.surfaces[key] = surface
+        return surface
+
+    # Кадры анимации из папки (в порядке имен файлов)
+    def frames(self, directory, size=None, flip=False):
+        names = sorted(os.listdir(os.path.join(self.root, directory)))
+        return [self.image(os.path.join(directory, name), size, flip) for name in names]
+
+    # Удаление варианта из кэша, когда из него уже собрано нужное
+    def discard(self, path, size=None, flip=False):
+        self.surfaces.pop((path, size, flip), None)
+
+    # Произвольная поверхность, построенная вызывающим кодом
+    def put(self, key, surface):
+        self.surfaces[key] = surface
+        return surface
+
+    def get(self, key):
+        return self.surfaces.get(key)
+
+    def font(self, path, size):
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(os.path.join(self.root, path), size)
+            self.fonts[key] = font
+        return font
+
+    # Количество поверхностей в кэше и занимаемая ими память
+    def stats(self):
+        total = 0
+        for surface in self.surfaces.values():
+            total += surface.get_pitch() * surface.get_height()
+        return len(self.surfaces), total
+
+    def report(self):
+        count, total = self.stats()
+        return f"assets: {count} surfaces, {total / 1024:.1f} KiB"
+
+
+# Размер текстуры во внутреннем разрешении кадра (scale — множители
+# по осям, как у display.Viewport)
+def scaled_size(size, scale):
+    return max(1, round(size[0] * scale[0])), max(1, round(size[1] * scale[1]))
+
+
+# Платформа из блоков, собранная один раз на каждую ширину и размер блока
+def platform_row(assets, width, height=1, tile=TILE_SIZE):
+    key = ("platform", width, height, tile)
+    surface = assets.get(key)
+    if surface is None:
+        block = assets.image("sprites/platform.png", tile)
+        surface = pygame.Surface((block.get_width() * width, block.get_height() * height))
+        for i in range(width):
+            for j in range(height):
+                surface.blit(block, (i * block.get_width(), j * block.get_height()))
+        surface = assets.put(key, assets.convert(surface))
+    return surface
+
+
+# Текстуры, которые нужны симуляции (см. world.placeholder_textures).
+# С scale они строятся из исходных файлов сразу в размере для
+# внутреннего разрешения кадра.
+def game_textures(assets, scale=(1.0, 1.0)):
+    tile = scaled_size(TILE_SIZE, scale)
+    jump_move = assets.image("sprites/jump_move.png", tile)
+    return {
+        "platforms": {(width, 1): platform_row(assets, width, tile=tile) for width in PLATFORM_WIDTHS},
+        "block": assets.image("sprites/platform.png", tile),
+        "idle": [assets.image("sprites/player.png", tile)],  # Основной спрайт
+        "right": assets.frames("sprites/animation", tile),
+        "left": assets.frames("sprites/animation", tile, flip=True),
+        "jump_idle": [assets.image("sprites/jump_idle.png", tile)],  # Прыжок на месте
+        "jump_move": [jump_move],  # Прыжок в движении
+        "jump_move_left": [assets.image("sprites/jump_move.png", tile, flip=True)],
+        "enemy": assets.image("sprites/enemy.png", tile),
+        "enemy_left": assets.image("sprites/enemy.png", tile, flip=True),
+        "coin": assets.image("sprites/coin.png", scaled_size(COIN_SIZE, scale)),  # Текстура монетки
+    }
+
+
+# Все поверхности набора текстур по порядку (словари и списки обходятся
+# вглубь), чтобы сопоставить два набора с одинаковыми ключами
+def texture_surfaces(textures):
+    for value in textures.values():
+        if isinstance(value, dict):
+            yield from texture_surfaces(value)
+        elif isinstance(value, list):
+            yield from value
+        else:
+            yield value
+
+
+# Фоновая загрузка ресурсов. Задания (имя -> функция без аргументов)
+# выполняются по очереди в отдельном потоке; после каждого в очередь
+# событий кладется LOAD_PROGRESS, так что главный цикл не опрашивает
+# загрузчик и не блокируется на нем.
+class AssetLoader:
+    def __init__(self, jobs, event_type=LOAD_PROGRESS):
+        self.jobs = jobs
+        self.event_type = event_type
+        self.results = {}
+        self.done = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="asset-loader", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        total = len(self.jobs)
+        for name, job in self.jobs.items():
+            try:
+                self.results[name] = job()
+            except Exception as error:
+                self.error = error  # Ошибка поднимется в главном потоке
+                pygame.event.post(pygame.event.Event(self.event_type, done=self.done, total=total, error=error))
+                return
+            self.done += 1
+            pygame.event.post(pygame.event.Event(self.event_type, done=self.done, total=total, error=None))
+
+    # Доля выполненных заданий для полосы загрузки
+    @property
+    def progress(self):
+        return self.done / max(1, len(self.jobs))
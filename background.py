@@ -0,0 +1,96 @@
+import pygame
+
+from settings import SKY_BLUE
+
+
+# Один слой параллакса: плитка, которая повторяется по обеим осям.
+# Рисуются только плитки, попадающие на экран, поэтому каждый
+# пиксель экрана заполняется слоем ровно один раз.
+class ParallaxLayer:
+    def __init__(self, tile, speed_x=0.0, factor_y=0.0):
+        self.tile = tile
+        self.tile_width = tile.get_width()
+        self.tile_height = tile.get_height()
+        self.speed_x = speed_x  # Собственный дрейф по X за тик
+        self.factor_y = factor_y  # Доля вертикального сдвига, которую получает слой
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.drawn_at = None  # Целочисленное смещение при последней отрисовке
+
+    # Сдвинулась ли картинка слоя с последней отрисовки
+    @property
+    def moved(self):
+        return self.drawn_at != (int(self.offset_x), int(self.offset_y))
+
+    def scroll(self, dy):
+        self.offset_x = (self.offset_x - self.speed_x) % self.tile_width
+        self.offset_y = (self.offset_y + dy * self.factor_y) % self.tile_height
+
+    def draw(self, screen):
+        width, height = screen.get_size()
+        self.drawn_at = (int(self.offset_x), int(self.offset_y))
+        start_x = int(self.offset_x) - self.tile_width if self.offset_x else 0
+        start_y = int(self.offset_y) - self.tile_height if self.offset_y else 0
+        screen.blits([
+            (self.tile, (x, y))
+            for y in range(start_y, height, self.tile_height)
+            for x in range(start_x, width, self.tile_width)
+        ], False)
+
+
+# Фон из нескольких слоев, от дальнего к ближнему. Если дальний
+# слой непрозрачный, заливка экрана не нужна.
+class ParallaxBackground:
+    def __init__(self, layers, fill=None):
+        self.layers = layers
+        self.fill = fill
+
+    def update(self, dy):
+        for layer in self.layers:
+            layer.scroll(dy)
+
+    @property
+    def moved(self):
+        return any(layer.moved for layer in self.layers)
+
+    def draw(self, screen):
+        if self.fill is not None:
+            screen.fill(self.fill)
+        for layer in self.layers:
+            layer.draw(screen)
+
+    # Память, занятая плитками слоев
+    def memory(self):
+        return sum(layer.tile.get_pitch() * layer.tile_height for layer in self.layers)
+
+
+# Облака поверх неба, заранее сведенные в одну непрозрачную плитку
+# размером с текстуру: без альфа-смешивания при каждом кадре. Для
+# внутреннего разрешения кадра плитка масштабируется один раз (scale —
+# множители по осям, как у display.Viewport).
+def sky_tile(assets, path="sprites/background.png", color=SKY_BLUE, scale=(1.0, 1.0)):
+    key = ("sky", path, color, scale)
+    tile = assets.get(key)
+    if tile is None:
+        if scale != (1.0, 1.0):
+            base = sky_tile(assets, path, color)
+            size = (max(1, round(base.get_width() * scale[0])), max(1, round(base.get_height() * scale[1])))
+            return assets.put(key, pygame.transform.scale(base, size))
+        clouds = assets.image(path)
+        tile = pygame.Surface(clouds.get_size())
+        tile.fill(color)
+        tile.blit(clouds, (0, 0))
+        tile = assets.put(key, assets.convert(tile))
+        assets.discard(path)  # Исходная текстура с альфой больше не нужна
+    return tile
+
+
+# Фон игры: один непрозрачный слой облаков. Сдвигается на drift
+# пикселей за тик влево и на десятую часть вертикальной скорости
+# игрока. Без дрейфа фон неподвижен, пока игрок стоит на платформе.
+# Скорости заданы в логических пикселях и умножаются на scale.
+class CloudBackground(ParallaxBackground):
+    def __init__(self, assets, drift=1, scale=(1.0, 1.0)):
+        scale_x, scale_y = scale
+        tile = sky_tile(assets, scale=scale)
+        super().__init__([ParallaxLayer(tile, speed_x=drift * scale_x, factor_y=0.1 * scale_y)])
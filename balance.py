@@ -0,0 +1,193 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from array import array
+
+# Без окна и без звука
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from headless import climber_policy, random_policy
+from level import LEVEL_PARAMS, reachable
+from world import GameWorld
+
+# Столбцы результатов: имя -> код типа array
+COLUMNS = {
+    "combo": "i",  # Номер набора параметров
+    "seed": "q",
+    "ticks": "i",
+    "score": "i",
+    "height": "i",  # Наибольшая высота подъема в пикселях
+    "death": "b",  # DEATHS
+    "platforms": "i",  # Сгенерировано платформ
+    "unreachable": "i",  # Из них недостижимы прыжком с предыдущей
+}
+
+DEATHS = ("timeout", "fall", "enemy")
+
+# Сколько эпизодов копится в памяти перед дозаписью столбцов на диск
+FLUSH_EVERY = 256
+
+
+# Мир, который проверяет каждую новую платформу: достижима ли она
+# прыжком с предыдущей (платформы идут снизу вверх)
+class ProbeWorld(GameWorld):
+    def reset(self, seed=None):
+        self.generated = 0
+        self.unreachable = 0
+        self.last_platform = None
+        super().reset(seed)
+
+    def add_scenery(self, platforms, coins, enemies):
+        for platform in sorted(platforms, key=lambda p: p.rect.top, reverse=True):
+            if self.last_platform is not None and not reachable(self.last_platform, platform.rect):
+                self.unreachable += 1
+            self.last_platform = platform.rect.copy()
+            self.generated += 1
+        super().add_scenery(platforms, coins, enemies)
+
+
+# Один эпизод; задание — (номер набора, параметры, сид, политика, лимит тиков)
+def run_episode(task):
+    combo, params, seed, policy_name, max_ticks = task
+    world = ProbeWorld(seed, params=params)
+    policy = climber_policy if policy_name == "climber" else random_policy(seed)
+    while not world.game_over and world.tick < max_ticks:
+        world.step(policy(world))
+    death = DEATHS.index(world.death) if world.game_over else 0
+    return (combo, seed, world.tick, world.score, world.height, death,
+            world.generated, world.unreachable)
+
+
+# Столбцовая запись результатов: по файлу на столбец (сырые значения
+# little-endian) и schema.json с типами и наборами параметров. Файлы
+# дописываются порциями по мере прихода результатов.
+class ColumnWriter:
+    def __init__(self, directory, combos):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.columns = {name: array(code) for name, code in COLUMNS.items()}
+        self.rows = 0
+        for name in COLUMNS:
+            open(self._path(name), "wb").close()
+        with open(os.path.join(directory, "schema.json"), "w") as f:
+            json.dump({"columns": COLUMNS, "deaths": DEATHS, "combos": combos}, f, indent=2)
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def append(self, row):
+        for column, value in zip(self.columns.values(), row):
+            column.append(value)
+        self.rows += 1
+        if self.rows % FLUSH_EVERY == 0:
+            self.flush()
+
+    def flush(self):
+        for name, column in self.columns.items():
+            if sys.byteorder != "little":
+                column.byteswap()
+            with open(self._path(name), "ab") as f:
+                column.tofile(f)
+            del column[:]
+
+
+# Чтение результатов: имя столбца -> array
+def load_results(directory):
+    with open(os.path.join(directory, "schema.json")) as f:
+        schema = json.load(f)
+    columns = {}
+    for name, code in schema["columns"].items():
+        column = array(code)
+        with open(os.path.join(directory, f"{name}.bin"), "rb") as f:
+            column.frombytes(f.read())
+        if sys.byteorder != "little":
+            column.byteswap()
+        columns[name] = column
+    return schema, columns
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, len(values) * p // 100)] if values else 0
+
+
+# Сводка по каждому набору параметров
+def report(combos, rows):
+    for index, params in enumerate(combos):
+        mine = [row for row in rows if row[0] == index]
+        if not mine:
+            continue
+        heights = sorted(row[4] for row in mine)
+        deaths = [sum(1 for row in mine if row[5] == d) for d in range(len(DEATHS))]
+        generated = sum(row[6] for row in mine)
+        unreachable = sum(row[7] for row in mine)
+        broken = sum(1 for row in mine if row[7])
+        changed = {k: v for k, v in params.items() if v != LEVEL_PARAMS[k]} or "defaults"
+        print(f"[{index}] {changed}")
+        print(f"    episodes {len(mine)}  score mean {sum(row[3] for row in mine) / len(mine):.0f}  "
+              f"height p10/p50/p90 {percentile(heights, 10)}/{percentile(heights, 50)}/{percentile(heights, 90)} px")
+        print("    deaths " + "  ".join(f"{name} {count / len(mine):.0%}" for name, count in zip(DEATHS, deaths)))
+        print(f"    unreachable platforms {unreachable}/{generated} ({unreachable / max(1, generated):.2%}), "
+              f"episodes with any {broken / len(mine):.0%}")
+
+
+# Значения параметра из строки «имя=v1,v2,...»
+def parse_sweep(text):
+    name, _, values = text.partition("=")
+    if name not in LEVEL_PARAMS or not values:
+        raise argparse.ArgumentTypeError(f"ожидается имя=v1,v2 с именем из: {', '.join(LEVEL_PARAMS)}")
+    kind = type(LEVEL_PARAMS[name])
+    return name, [kind(value) for value in values.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Подбор сложности Mario Parkour методом Монте-Карло")
+    parser.add_argument("--set", type=parse_sweep, action="append", default=[], metavar="NAME=V1,V2",
+                        help=f"перебираемый параметр: {', '.join(LEVEL_PARAMS)}")
+    parser.add_argument("--episodes", type=int, default=100, help="эпизодов на каждый набор параметров")
+    parser.add_argument("--seed", type=int, default=0, help="первый сид")
+    parser.add_argument("--policy", choices=["climber", "random"], default="climber")
+    parser.add_argument("--max-ticks", type=int, default=6000, help="лимит эпизода (по умолчанию 100 секунд игры)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", metavar="DIR", help="записать результаты по столбцам в папку")
+    args = parser.parse_args()
+
+    # Декартово произведение перебираемых значений
+    names = [name for name, _ in args.set]
+    combos = [
+        {**LEVEL_PARAMS, **dict(zip(names, values))}
+        for values in itertools.product(*(values for _, values in args.set))
+    ]
+    tasks = [
+        (index, params, args.seed + episode, args.policy, args.max_ticks)
+        for index, params in enumerate(combos)
+        for episode in range(args.episodes)
+    ]
+
+    writer = ColumnWriter(args.output, combos) if args.output else None
+    rows = []
+    start = shown = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        for done, row in enumerate(pool.imap_unordered(run_episode, tasks, chunksize=4), 1):
+            rows.append(row)
+            if writer is not None:
+                writer.append(row)
+            # Строка прогресса обновляется не чаще 10 раз в секунду
+            now = time.perf_counter()
+            if now - shown >= 0.1 or done == len(tasks):
+                shown = now
+                print(f"\r{done}/{len(tasks)} episodes  {done / (now - start):.1f} ep/s", end="", file=sys.stderr)
+    print(file=sys.stderr)
+    if writer is not None:
+        writer.flush()
+
+    report(combos, rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
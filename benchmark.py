@@ -0,0 +1,338 @@
+import argparse
+import json
+import os
+import platform as platform_info
+import random
+import sys
+import time
+import tracemalloc
+
+# Бенчмарки идут без настоящего окна и звука
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from assets import AssetManager
+from background import CloudBackground
+from display import Display, parse_resolution
+from headless import climber_policy
+from level import chunk_layout
+from profiler import NULL_PROFILER
+from render import FullRenderer, HudText, HUD_POS
+from scenes import Game
+from settings import WIDTH, HEIGHT, BLACK, EVENT_COIN, EVENT_GAME_OVER, EVENT_CHECKPOINT
+from world import GameWorld, Platform, Coin, Enemy, TILE, ENTITY_STORES
+
+SEED = 12345
+
+# Метрики, по которым сравнивается с базовой линией: больше — лучше
+HIGHER_IS_BETTER = ("updates_per_sec", "renders_per_sec")
+LOWER_IS_BETTER = ("frame_ms", "peak_kib", "allocations", "blocks_delta")
+
+
+# Сценарий нагрузки: подготовка мира после каждого сброса, политика
+# ввода и действия после тика. По умолчанию игрок стоит на месте.
+class Scenario:
+    ticks = 3000
+    frames = 300
+    params = None  # Параметры генерации уровня (None — по умолчанию)
+
+    def setup(self, world):
+        pass
+
+    def policy(self, world):
+        return 0
+
+    def after_step(self, world):
+        pass
+
+
+# Толпа врагов выше игрока: он стоит на стартовой платформе, а враги
+# бегают по экрану и выше него, не задевая его
+class EnemyHorde(Scenario):
+    def __init__(self, count):
+        self.count = count
+        self.ticks = max(300, 3000000 // (count * 10))
+        self.frames = max(30, 300000 // (count * 10))
+
+    def setup(self, world):
+        rng = random.Random(world.seed)
+        enemies = [
+            world.pools.enemies.acquire(rng.randint(0, WIDTH - TILE), rng.randint(-HEIGHT, HEIGHT // 2), rng.choice([-3, 3]))
+            for _ in range(self.count)
+        ]
+        world.add_scenery([], [], enemies)
+
+
+# Очень широкие платформы (до ширины экрана и больше) с монетками
+class WidePlatforms(Scenario):
+    def setup(self, world):
+        rng = random.Random(world.seed)
+        platforms = []
+        coins = []
+        for i in range(200):
+            width = rng.randint(20, 40)
+            y = HEIGHT - 150 - i * 90
+            platforms.append(world.pools.platforms.acquire(rng.randint(-400, 0), y, width))
+            coins.append(world.pools.coins.acquire(rng.randint(0, WIDTH), y - 20))
+        world.add_scenery(platforms, coins, [])
+
+
+# Долгий подъем бота с максимальным шансом появления врагов
+# (враг на каждой платформе, кроме первого экрана)
+class LongClimb(Scenario):
+    ticks = 20000
+    params = {"enemy_spawn_chance": 1.0}
+
+    def policy(self, world):
+        return climber_policy(world)
+
+
+# Многократные перезапуски мира: память не должна расти
+class RestartCycles(Scenario):
+    ticks = 30000
+    restart_every = 60
+
+    def policy(self, world):
+        return climber_policy(world)
+
+    def after_step(self, world):
+        if world.tick >= self.restart_every:
+            world.reset(world.seed + 1)
+
+
+# Только генерация уровня без пулов — по чанку за тик, объекты
+# создаются заново (путь с выделением памяти)
+class GenerateOnly(Scenario):
+    ticks = 5000
+    frames = 0
+
+    def setup(self, world):
+        self.index = 0
+
+    def step(self, world):
+        textures = world.textures
+        for x, y, width, coin_x, enemy_vel in chunk_layout(world.seed, self.index):
+            Platform(textures, x, y, width)
+            if coin_x is not None:
+                Coin(textures, coin_x, y - 20)
+            if enemy_vel is not None:
+                Enemy(textures, x + 30, y - 50, enemy_vel)
+        self.index += 1
+
+
+SCENARIOS = {
+    "enemies_1k": lambda: EnemyHorde(1000),
+    "enemies_10k": lambda: EnemyHorde(10000),
+    "wide_platforms": WidePlatforms,
+    "long_climb": LongClimb,
+    "restart_cycles": RestartCycles,
+    "generate": GenerateOnly,
+}
+
+
+def run_ticks(world, scenario, ticks):
+    step = getattr(scenario, "step", None)
+    for _ in range(ticks):
+        if step is not None:
+            step(world)
+            continue
+        world.step(scenario.policy(world))
+        scenario.after_step(world)
+        if world.game_over:
+            world.reset(world.seed + 1)
+            scenario.setup(world)
+
+
+def fresh_world(scenario, textures, entities):
+    world = GameWorld(SEED, textures, entities, scenario.params)
+    scenario.setup(world)
+    return world
+
+
+# Скорость берется по лучшему из repeat прогонов: так меньше шума
+def run_scenario(scenario, textures, renderer, scale, repeat, entities="sprites"):
+    ticks = max(1, int(scenario.ticks * scale))
+    frames = int(scenario.frames * scale)
+
+    updates_per_sec = renders_per_sec = 0.0
+    for _ in range(repeat):
+        # Обновления в секунду
+        world = fresh_world(scenario, textures, entities)
+        allocations = world.allocations
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        run_ticks(world, scenario, ticks)
+        updates_per_sec = max(updates_per_sec, ticks / (time.perf_counter() - start))
+        allocations = world.allocations - allocations
+        blocks_delta = sys.getallocatedblocks() - blocks
+
+        # Кадры в секунду (фон, спрайты, счет и вывод)
+        if frames:
+            start = time.perf_counter()
+            for _ in range(frames):
+                renderer.draw(world)
+                renderer.present()
+            renders_per_sec = max(renders_per_sec, frames / (time.perf_counter() - start))
+
+    # Пиковая память — отдельным прогоном, чтобы tracemalloc не искажал скорость
+    del world
+    tracemalloc.start()
+    world = fresh_world(scenario, textures, entities)
+    run_ticks(world, scenario, max(1, ticks // 4))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "updates_per_sec": round(updates_per_sec, 1),
+        "renders_per_sec": round(renders_per_sec, 1),
+        "frame_ms": round(1000 / renders_per_sec, 3) if renders_per_sec else 0.0,
+        "peak_kib": round(peak / 1024, 1),
+        "allocations": allocations,
+        "blocks_delta": blocks_delta,
+    }
+
+
+# Звук-заглушка: в прогоне на выносливость звук не нужен
+class Silence:
+    def play(self):
+        pass
+
+
+# Прогон на выносливость: сотни циклов «забег -> конец -> забег» через
+# машину состояний. Память после прогрева не должна расти.
+def soak(display, assets, textures, font, restarts, frames_per_run=30, warmup=20, entities="sprites"):
+    options = argparse.Namespace(renderer="full", fps=0, profiler=NULL_PROFILER, entities=entities,
+                                 record=None, ghost=None)
+    sounds = {event: Silence() for event in (EVENT_COIN, EVENT_GAME_OVER, EVENT_CHECKPOINT)}
+    game = Game(display, assets, font, options)
+    game.set_assets(textures, sounds)
+    restart = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_r)
+
+    tracemalloc.start()
+    game.switch("play")
+    base = None
+    start = time.perf_counter()
+    for i in range(restarts):
+        for _ in range(frames_per_run):
+            game.frame([])
+        game.world.game_over = True
+        game.frame([])  # Переход в меню проигрыша
+        game.frame([restart])  # И обратно в забег
+        if i + 1 == warmup:
+            base = tracemalloc.get_traced_memory()[0]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    elapsed = time.perf_counter() - start
+    growth = current - base if base is not None else 0
+    return {
+        "restarts": restarts,
+        "restarts_per_sec": round(restarts / elapsed, 1),
+        "growth_kib": round(growth / 1024, 1),
+        "growth_per_restart_bytes": round(growth / max(1, restarts - warmup), 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+# Сравнение с базовой линией: относительное изменение каждой метрики
+# и признак регрессии сверх допуска
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        for key, value in metrics.items():
+            old = base.get(key)
+            if not old:
+                continue
+            change = (value - old) / old
+            worse = (key in HIGHER_IS_BETTER and change < -tolerance) or \
+                    (key in LOWER_IS_BETTER and change > tolerance)
+            mark = "  REGRESSION" if worse else ""
+            print(f"  {name:<16} {key:<16} {old:>12} -> {value:>12} ({change:+.1%}){mark}")
+            if worse:
+                regressions.append((name, key))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки Mario Parkour")
+    parser.add_argument("scenarios", nargs="*", help=f"сценарии (по умолчанию все): {', '.join(SCENARIOS)}")
+    parser.add_argument("--scale", type=float, default=1.0, help="множитель длины прогонов")
+    parser.add_argument("--repeat", type=int, default=3, help="число прогонов для замера скорости")
+    parser.add_argument("--output", help="записать результаты в JSON")
+    parser.add_argument("--baseline", help="сравнить с сохраненными результатами")
+    parser.add_argument("--save-baseline", help="сохранить результаты как базовую линию")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="допустимое ухудшение (доля)")
+    parser.add_argument("--entities", choices=ENTITY_STORES, default="sprites",
+                        help="хранение монеток и врагов: спрайты или массивы NumPy")
+    parser.add_argument("--resolution", type=parse_resolution, nargs="+", default=[(WIDTH, HEIGHT)], metavar="WxH",
+                        help="внутренние разрешения кадра: время кадра замеряется для каждого")
+    parser.add_argument("--soak", type=int, metavar="N", help="вместо сценариев: N перезапусков через сцены")
+    args = parser.parse_args()
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(unknown)}")
+
+    pygame.init()
+    assets = AssetManager()
+    display = Display(assets=assets)
+    textures = display.viewport.game_textures()
+    font = assets.font("font/supermario_font.otf", 32)
+
+    if args.soak:
+        result = soak(display, assets, textures, font, args.soak, entities=args.entities)
+        print("soak " + "  ".join(f"{key}={value}" for key, value in result.items()))
+        pygame.quit()
+        # Больше 1 КиБ на перезапуск — утечка
+        return 1 if result["growth_per_restart_bytes"] > 1024 else 0
+
+    # Кадр рисуется во внутреннем разрешении и растягивается в окно
+    # одним scale, как в игре с --present blit
+    results = {}
+    for resolution in args.resolution:
+        display = Display(resolution, assets=assets)
+        viewport = display.viewport
+        viewport.game_textures()  # Варианты текстур для этого разрешения
+        scale = (viewport.scale_x, viewport.scale_y)
+        hud_font = assets.font("font/supermario_font.otf", max(8, round(32 * viewport.scale_y)))
+        hud = HudText(hud_font, "Score: {}", BLACK, viewport.point(*HUD_POS))
+        renderer = FullRenderer(display.target, CloudBackground(assets, scale=scale), hud, display, viewport)
+        for name in names:
+            metrics = run_scenario(SCENARIOS[name](), textures, renderer, args.scale, args.repeat, args.entities)
+            if resolution != (WIDTH, HEIGHT):
+                name = f"{name}@{resolution[0]}x{resolution[1]}"
+            results[name] = metrics
+            print(f"{name:<24} " + "  ".join(f"{key}={value}" for key, value in metrics.items()))
+
+    report = {
+        "python": sys.version.split()[0],
+        "pygame": pygame.version.ver,
+        "machine": platform_info.machine(),
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "entities": args.entities,
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"compared with {args.baseline}:")
+        if compare(results, baseline, args.tolerance):
+            status = 1
+    pygame.quit()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+from settings import WIDTH, HEIGHT
+
+
+# Камера: мировые координаты объектов не меняются, а смещение
+# применяется только при отрисовке. Мировая ось Y направлена вниз,
+# поэтому при подъеме игрока y камеры уменьшается.
+class Camera:
+    def __init__(self, width=WIDTH, height=HEIGHT):
+        self.width = width
+        self.height = height
+        self.y = 0.0  # Мировая координата верхнего края экрана
+        self.prev_y = 0.0  # Та же координата на предыдущем тике
+
+    # Подтягивает камеру за игроком, если он выше трети экрана.
+    # Возвращает True, если камера сдвинулась.
+    def follow(self, target_y):
+        self.prev_y = self.y
+        limit = self.y + self.height // 3
+        if target_y < limit:
+            self.y = target_y - self.height // 3
+            return True
+        return False
+
+    # Мировая координата нижнего края экрана: все, что ниже, удаляется
+    @property
+    def cutoff(self):
+        return self.y + self.height
+
+    # Положение камеры между двумя тиками (alpha от 0 до 1)
+    def view_y(self, alpha=1.0):
+        return self.prev_y + (self.y - self.prev_y) * alpha
+
+    # Экранный прямоугольник спрайта с интерполяцией между тиками
+    @staticmethod
+    def screen_rect(sprite, offset, alpha=1.0):
+        if alpha >= 1.0 or (sprite.x == sprite.prev_x and sprite.y == sprite.prev_y):
+            return sprite.rect.move(0, -offset)
+        x = sprite.prev_x + (sprite.x - sprite.prev_x) * alpha
+        y = sprite.prev_y + (sprite.y - sprite.prev_y) * alpha
+        return sprite.rect.move(round(x) - sprite.rect.x, round(y) - sprite.rect.y - offset)
+
+    # Видимые спрайты: спрайт -> экранный прямоугольник
+    def project(self, sprites, alpha=1.0):
+        top = self.view_y(alpha)
+        offset = round(top)
+        bottom = top + self.height
+        return {
+            sprite: self.screen_rect(sprite, offset, alpha)
+            for sprite in sprites
+            if sprite.rect.bottom > top and sprite.rect.top < bottom
+        }
+
+    # Отрисовка видимых спрайтов одним вызовом blits
+    def draw(self, surface, sprites, alpha=1.0):
+        surface.blits([
+            (sprite.image, rect)
+            for sprite, rect in self.project(sprites, alpha).items()
+        ], False)
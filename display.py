@@ -0,0 +1,125 @@
+import argparse
+
+import pygame
+
+from assets import AssetManager, game_textures, scaled_size, texture_surfaces
+from settings import WIDTH, HEIGHT
+
+# Способы вывода кадра: scaled — окно pygame.SCALED, растягивает
+# видеокарта; blit — один transform.scale кадра в окно на процессоре
+PRESENT_MODES = ("scaled", "blit")
+
+
+# Разрешение из строки «ШxВ»
+def parse_resolution(text):
+    width, _, height = text.lower().partition("x")
+    try:
+        size = (int(width), int(height))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается ШИРИНАxВЫСОТА, например 400x300: {text}")
+    if min(size) <= 0:
+        raise argparse.ArgumentTypeError(f"размер должен быть положительным: {text}")
+    return size
+
+
+# Мир всегда считается в логических пикселях WIDTH x HEIGHT, а рисуется
+# во внутреннее разрешение кадра: позиции умножаются на масштаб, а вместо
+# каждой текстуры берется ее вариант для этого разрешения из кэша ресурсов
+# (ключ ("scaled", исходная поверхность, размер кадра)).
+class Viewport:
+    def __init__(self, size=(WIDTH, HEIGHT), assets=None):
+        self.size = tuple(size)
+        self.scale_x = size[0] / WIDTH
+        self.scale_y = size[1] / HEIGHT
+        self.native = self.size == (WIDTH, HEIGHT)
+        self.assets = assets if assets is not None else AssetManager()
+
+    # Текстуры симуляции. Для другого разрешения их варианты строятся
+    # из исходных файлов сразу в нужном размере, а не растягиванием
+    # готовых 40x40, поэтому в большом кадре картинка четкая.
+    def game_textures(self):
+        textures = game_textures(self.assets)
+        if not self.native:
+            scaled = game_textures(self.assets, (self.scale_x, self.scale_y))
+            for original, image in zip(texture_surfaces(textures), texture_surfaces(scaled)):
+                self.assets.put(("scaled", original, self.size), image)
+        return textures
+
+    # Вариант текстуры для кадра. Поверхности, построенные на ходу
+    # (платформы необычной ширины, «призрак»), масштабируются один раз.
+    def image(self, surface):
+        if self.native:
+            return surface
+        key = ("scaled", surface, self.size)
+        scaled = self.assets.get(key)
+        if scaled is None:
+            size = scaled_size(surface.get_size(), (self.scale_x, self.scale_y))
+            scaled = self.assets.put(key, pygame.transform.scale(surface, size))
+        return scaled
+
+    def point(self, x, y):
+        return round(x * self.scale_x), round(y * self.scale_y)
+
+    def rect(self, rect):
+        x, y = self.point(rect.x, rect.y)
+        right, bottom = self.point(rect.right, rect.bottom)
+        return pygame.Rect(x, y, right - x, bottom - y)
+
+    # Видимые объекты (ключ -> (экранный прямоугольник, картинка))
+    # в пикселях внутреннего кадра
+    def project(self, visible):
+        if self.native:
+            return visible
+        projected = {}
+        for key, (rect, image) in visible.items():
+            image = self.image(image)
+            projected[key] = (image.get_rect(topleft=self.point(rect.x, rect.y)), image)
+        return projected
+
+
+# Окно и кадр, в который рисует игра (target). Если разрешение кадра
+# совпадает с окном, рисование идет прямо в окно. Методы flip() и
+# update() повторяют pygame.display, поэтому отрисовщику все равно,
+# куда выводить.
+class Display:
+    def __init__(self, resolution=(WIDTH, HEIGHT), present="blit", fullscreen=False, assets=None):
+        self.resolution = tuple(resolution)
+        self.present = present
+        if present == "scaled":
+            # SDL сам растягивает кадр до окна с сохранением пропорций
+            flags = pygame.SCALED | (pygame.FULLSCREEN if fullscreen else 0)
+            self.window = pygame.display.set_mode(self.resolution, flags)
+        elif fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)  # Размер рабочего стола
+        else:
+            self.window = pygame.display.set_mode((WIDTH, HEIGHT))
+
+        if self.window.get_size() == self.resolution:
+            self.target = self.window
+            self.area = None
+        else:
+            self.target = pygame.Surface(self.resolution).convert()
+            # Кадр вписывается в окно с сохранением пропорций, по краям — черные поля
+            window_w, window_h = self.window.get_size()
+            scale = min(window_w / self.resolution[0], window_h / self.resolution[1])
+            self.area = pygame.Rect(0, 0, round(self.resolution[0] * scale), round(self.resolution[1] * scale))
+            self.area.center = self.window.get_rect().center
+            self.window.fill((0, 0, 0))
+        self.viewport = Viewport(self.resolution, assets)
+
+    def flip(self):
+        if self.area is not None:
+            pygame.transform.scale(self.target, self.area.size, self.window.subsurface(self.area))
+        pygame.display.flip()
+
+    # Обновление областей кадра; при растяжении blit окно выводится целиком
+    def update(self, rects=None):
+        if self.area is not None:
+            self.flip()
+        elif rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+    def describe(self):
+        return f"{self.resolution[0]}x{self.resolution[1]} {self.present}"
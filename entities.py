@@ -0,0 +1,178 @@
+import pygame
+
+from settings import WIDTH
+
+# NumPy нужен только для хранения объектов в массивах (--entities arrays)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Начальная вместимость массивов; при нехватке она удваивается
+CAPACITY = 256
+
+
+# Округление координат как в pygame.Rect: половина — от нуля
+def pixels(values):
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
+
+
+# Хранилище однотипных объектов уровня в виде структуры массивов:
+# позиции, скорости, кадр и флаг жизни лежат в массивах NumPy, а
+# движение, столкновения, удаление и отрисовка — по одной векторной
+# операции на все объекты сразу. acquire() возвращает номер объекта
+# (как Pool.acquire возвращает спрайт), и объект сразу живет в мире.
+class EntityArrays:
+    def __init__(self, images, capacity=CAPACITY):
+        if np is None:
+            raise ImportError("для хранения объектов в массивах нужен numpy")
+        self.images = images  # Кадр объекта — индекс в этом списке
+        self.width, self.height = images[0].get_size()
+        self.count = 0
+        self.next_id = 0
+        self.created = 0  # Сколько раз выделялась память под массивы
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = self.count
+        fields = {
+            "x": np.float64, "prev_x": np.float64, "vel_x": np.float64,
+            "left": np.int64, "top": np.int64,  # Как rect.left и rect.top
+            "frame": np.int8, "alive": np.bool_, "ids": np.int64,
+        }
+        for name, dtype in fields.items():
+            array = np.zeros(capacity, dtype)
+            if old:
+                array[:old] = getattr(self, name)[:old]
+            setattr(self, name, array)
+        self.capacity = capacity
+        self.created += 1
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+    def clear(self):
+        self.count = 0
+
+    def acquire(self, x, y, vel_x=0):
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.vel_x[i] = vel_x
+        rect = pygame.Rect(x, y, 0, 0)  # Округление как у спрайта
+        self.left[i] = rect.x
+        self.top[i] = rect.y
+        self.frame[i] = 0
+        self.alive[i] = True
+        self.ids[i] = self.next_id
+        self.next_id += 1
+        self.count += 1
+        return self.next_id - 1
+
+    # Маска живых объектов, пересекающих прямоугольник (как colliderect)
+    def overlaps(self, rect):
+        n = self.count
+        left = self.left[:n]
+        top = self.top[:n]
+        return (
+            self.alive[:n]
+            & (left < rect.right) & (left + self.width > rect.left)
+            & (top < rect.bottom) & (top + self.height > rect.top)
+        )
+
+    def any(self, rect):
+        return bool(self.overlaps(rect).any())
+
+    # Удаление объектов ниже cutoff и уже убранных: массивы сжимаются
+    # с сохранением порядка, только если есть что удалять
+    def despawn(self, cutoff):
+        n = self.count
+        drop = ~self.alive[:n] | (self.top[:n] > cutoff)
+        if not drop.any():
+            return
+        keep = ~drop
+        kept = int(np.count_nonzero(keep))
+        for name in ("x", "prev_x", "vel_x", "left", "top", "frame", "alive", "ids"):
+            array = getattr(self, name)
+            array[:kept] = array[:n][keep]
+        self.count = kept
+
+    # Видимые объекты: номера, экранные x и y (с интерполяцией между тиками)
+    def screen_positions(self, camera, alpha=1.0):
+        n = self.count
+        top = camera.view_y(alpha)
+        offset = round(top)
+        rect_top = self.top[:n]
+        visible = np.flatnonzero(
+            self.alive[:n] & (rect_top + self.height > top) & (rect_top < top + camera.height)
+        )
+        xs = self.left[visible]
+        if alpha < 1.0:
+            x = self.x[visible]
+            prev = self.prev_x[visible]
+            moved = x != prev
+            xs = np.where(moved, np.round(prev + (x - prev) * alpha).astype(np.int64), xs)
+        return visible, xs, self.top[visible] - offset
+
+    # Отрисовка видимых объектов одним вызовом blits
+    def draw(self, surface, camera, alpha=1.0):
+        visible, xs, ys = self.screen_positions(camera, alpha)
+        images = self.images
+        surface.blits([
+            (images[frame], (x, y))
+            for frame, x, y in zip(self.frame[visible].tolist(), xs.tolist(), ys.tolist())
+        ], False)
+
+    # Видимые объекты для DirtyRenderer: (хранилище, номер) -> (прямоугольник, картинка)
+    def project(self, camera, alpha=1.0):
+        visible, xs, ys = self.screen_positions(camera, alpha)
+        images = self.images
+        width, height = self.width, self.height
+        return {
+            (self, entity): (pygame.Rect(x, y, width, height), images[frame])
+            for entity, frame, x, y in zip(
+                self.ids[visible].tolist(), self.frame[visible].tolist(), xs.tolist(), ys.tolist()
+            )
+        }
+
+
+# Монетки: позиция задается центром, как у world.Coin
+class CoinArrays(EntityArrays):
+    def __init__(self, textures, capacity=CAPACITY):
+        super().__init__([textures["coin"]], capacity)
+
+    def acquire(self, x, y):
+        return super().acquire(x - self.width // 2, y - self.height // 2)
+
+    # Сбор монеток игроком: возвращает, сколько собрано
+    def collect(self, rect):
+        hits = self.overlaps(rect)
+        collected = int(np.count_nonzero(hits))
+        if collected:
+            self.alive[:self.count][hits] = False
+        return collected
+
+
+# Враги: ходят по X и разворачиваются у краев экрана, как world.Enemy.
+# Кадр 0 — взгляд вправо, 1 — отзеркаленная текстура.
+class EnemyArrays(EntityArrays):
+    def __init__(self, textures, capacity=CAPACITY):
+        super().__init__([textures["enemy"], textures["enemy_left"]], capacity)
+
+    def update(self):
+        n = self.count
+        x = self.x[:n]
+        vel_x = self.vel_x[:n]
+        self.prev_x[:n] = x
+        x += vel_x
+        left = self.left[:n]
+        left[:] = pixels(x)
+
+        # Текстура по направлению до разворота, как в Enemy.update
+        frame = self.frame[:n]
+        frame[vel_x > 0] = 0
+        frame[vel_x < 0] = 1
+
+        # Ограничение на выход за границы экрана
+        vel_x[(left < 0) | (left + self.width > WIDTH)] *= -1
@@ -0,0 +1,308 @@
+import argparse
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+# Без окна и без звука
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from assets import AssetManager
+from background import CloudBackground
+from display import Viewport
+from settings import WIDTH, HEIGHT, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+from world import GameWorld, ENTITY_STORES
+
+# Действие — битовая маска INPUT_* (0..7), как ввод игрока за тик
+ACTION_COUNT = (INPUT_LEFT | INPUT_RIGHT | INPUT_JUMP) + 1
+
+# Сколько ближайших платформ, врагов и монеток попадает в признаки
+NEAREST = 3
+
+# Признаки: игрок (x, y на экране, vel_x, vel_y, на земле), затем по
+# NEAREST платформ (есть, dx, dy, ширина), врагов (есть, dx, dy, vel_x)
+# и монеток (есть, dx, dy). Смещения — от центра игрока, доли экрана.
+PLAYER_FEATURES = 5
+FEATURE_COUNT = PLAYER_FEATURES + NEAREST * (4 + 4 + 3)
+
+# Размер картинки-наблюдения по умолчанию (кадр в 4 раза меньше экрана)
+PIXELS_SIZE = (WIDTH // 4, HEIGHT // 4)
+
+OBSERVATIONS = ("features", "pixels")
+
+
+# Форма и тип буфера наблюдения. Картинка хранится как RGBX (4 байта
+# на пиксель), а наблюдение — вид [..., :3] на тот же буфер.
+def buffer_spec(obs="features", size=PIXELS_SIZE):
+    if obs == "pixels":
+        return (size[1], size[0], 4), np.uint8
+    return (FEATURE_COUNT,), np.float32
+
+
+# Окружение в стиле Gym вокруг GameWorld: reset(seed) и step(action)
+# возвращают наблюдение, награда — прирост счета. Наблюдение — всегда
+# один и тот же массив (или вид на внешний буфер out), который
+# перезаписывается следующим шагом; сохранять его нужно копией.
+# Картинка рисуется прямо в этот массив: поверхность pygame построена
+# поверх памяти буфера через image.frombuffer, без копирования.
+class MarioEnv:
+    def __init__(self, obs="features", size=PIXELS_SIZE, max_ticks=10000, entities="sprites", out=None):
+        self.obs_type = obs
+        self.max_ticks = max_ticks
+        shape, dtype = buffer_spec(obs, size)
+        self.buffer = np.zeros(shape, dtype) if out is None else out
+        self.world = GameWorld(textures=self._textures(size) if obs == "pixels" else None, entities=entities)
+
+        if obs == "pixels":
+            self.surface = pygame.image.frombuffer(self.buffer, size, "RGBX")
+            self.observation = self.buffer[..., :3]
+        else:
+            self.observation = self.buffer
+
+    # Настоящие текстуры нужны только картинке; признакам хватает заглушек.
+    # Кадр рисуется сразу в размере наблюдения (см. display.Viewport).
+    def _textures(self, size):
+        self.assets = AssetManager()
+        self.viewport = Viewport(size, self.assets)
+        return self.viewport.game_textures()
+
+    @property
+    def observation_shape(self):
+        return self.observation.shape
+
+    def reset(self, seed=None):
+        self.world.reset(seed)
+        if self.obs_type == "pixels":
+            scale = (self.viewport.scale_x, self.viewport.scale_y)
+            self.background = CloudBackground(self.assets, scale=scale)  # Облака с начала
+        self._observe()
+        return self.observation, self._info()
+
+    # Возвращает (наблюдение, награда, конец игры, обрезка по времени, info)
+    def step(self, action):
+        world = self.world
+        score = world.score
+        world.step(int(action))
+        if self.obs_type == "pixels":
+            self.background.update(world.player.vel_y)
+        self._observe()
+        terminated = world.game_over
+        truncated = not terminated and world.tick >= self.max_ticks
+        return self.observation, float(world.score - score), terminated, truncated, self._info()
+
+    def _info(self):
+        return {"score": self.world.score, "tick": self.world.tick, "seed": self.world.seed}
+
+    def _observe(self):
+        if self.obs_type == "pixels":
+            self._render()
+        else:
+            features(self.world, self.buffer)
+
+    def _render(self):
+        world = self.world
+        camera = world.camera
+        self.background.draw(self.surface)
+        visible = {sprite: (rect, sprite.image) for sprite, rect in camera.project(world.all_sprites).items()}
+        for store in world.stores:
+            visible.update(store.project(camera))
+        self.surface.blits([(image, rect) for rect, image in self.viewport.project(visible).values()], False)
+
+
+# Центры и дополнительный признак объектов: платформы (ширина),
+# враги (скорость), монетки (без признака)
+def _platforms(world):
+    rects = [(p.rect.centerx, p.rect.top, p.rect.width) for p in world.platforms]
+    return np.array(rects, np.float64).reshape(-1, 3)
+
+
+def _enemies(world):
+    if world.stores:
+        store = world.enemy_store
+        n = store.count
+        return np.column_stack((
+            store.left[:n] + store.width / 2, store.top[:n] + store.height / 2, store.vel_x[:n],
+        ))
+    rects = [(e.rect.centerx, e.rect.centery, e.vel_x) for e in world.enemies]
+    return np.array(rects, np.float64).reshape(-1, 3)
+
+
+def _coins(world):
+    if world.stores:
+        store = world.coin_store
+        n = store.count
+        alive = store.alive[:n]
+        return np.column_stack((
+            store.left[:n][alive] + store.width / 2, store.top[:n][alive] + store.height / 2,
+        ))
+    rects = [c.rect.center for c in world.coins]
+    return np.array(rects, np.float64).reshape(-1, 2)
+
+
+# Запись NEAREST ближайших объектов в out: есть, dx, dy и доп. признаки
+def _nearest(out, items, cx, cy, scale):
+    out[:] = 0.0
+    if not len(items):
+        return
+    dx = items[:, 0] - cx
+    dy = items[:, 1] - cy
+    order = np.argsort(dx * dx + dy * dy, kind="stable")[:NEAREST]
+    rows = out.reshape(NEAREST, -1)
+    k = len(order)
+    rows[:k, 0] = 1.0
+    rows[:k, 1] = dx[order] / WIDTH
+    rows[:k, 2] = dy[order] / HEIGHT
+    if rows.shape[1] > 3:
+        rows[:k, 3] = items[order, 2] / scale
+
+
+# Вектор признаков мира (см. FEATURE_COUNT)
+def features(world, out=None):
+    if out is None:
+        out = np.zeros(FEATURE_COUNT, np.float32)
+    player = world.player
+    cx, cy = player.rect.center
+    out[0] = player.x / WIDTH
+    out[1] = (player.y - world.camera.y) / HEIGHT
+    out[2] = player.vel_x / player.speed
+    out[3] = player.vel_y / -player.jump_power
+    out[4] = float(player.on_ground)
+    end = PLAYER_FEATURES
+    _nearest(out[end:end + NEAREST * 4], _platforms(world), cx, cy, WIDTH)
+    end += NEAREST * 4
+    _nearest(out[end:end + NEAREST * 4], _enemies(world), cx, cy, 3)
+    end += NEAREST * 4
+    _nearest(out[end:end + NEAREST * 3], _coins(world), cx, cy, 1)
+    return out
+
+
+# Процесс-исполнитель: свои окружения first..first+count, наблюдения
+# пишутся прямо в общую память. Закончившийся эпизод сразу начинается
+# заново со следующим сидом (seed + номер окружения + total * k), а его
+# последнее наблюдение копией уходит в info["final_observation"].
+def _worker(conn, shm_name, total, first, count, kwargs):
+    shape, dtype = buffer_spec(kwargs.get("obs", "features"), kwargs.get("size", PIXELS_SIZE))
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffers = np.ndarray((total,) + shape, dtype, buffer=shm.buf)
+    envs = [MarioEnv(out=buffers[first + i], **kwargs) for i in range(count)]
+    seeds = [0] * count
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == "reset":
+                for i, env in enumerate(envs):
+                    seeds[i] = data + first + i
+                    env.reset(seeds[i])
+                conn.send(None)
+            elif command == "step":
+                rewards = np.zeros(count, np.float32)
+                terminated = np.zeros(count, np.bool_)
+                truncated = np.zeros(count, np.bool_)
+                infos = []
+                for i, env in enumerate(envs):
+                    observation, rewards[i], terminated[i], truncated[i], info = env.step(data[i])
+                    if terminated[i] or truncated[i]:
+                        info["final_observation"] = observation.copy()  # Сброс перезапишет буфер
+                        seeds[i] += total
+                        env.reset(seeds[i])
+                    infos.append(info)
+                conn.send((rewards, terminated, truncated, infos))
+            else:
+                break
+    finally:
+        del envs, buffers
+        shm.close()
+
+
+# Векторное окружение: n окружений в workers процессах. Наблюдения
+# всех окружений лежат в одном блоке общей памяти, и observations —
+# вид на него формы (n, *форма наблюдения) без копирования.
+class VectorEnv:
+    def __init__(self, n, workers=None, **kwargs):
+        workers = min(n, workers or os.cpu_count() or 1)
+        self.n = n
+        shape, dtype = buffer_spec(kwargs.get("obs", "features"), kwargs.get("size", PIXELS_SIZE))
+        self.shm = shared_memory.SharedMemory(create=True, size=n * int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        self.buffers = np.ndarray((n,) + shape, dtype, buffer=self.shm.buf)
+        self.observations = self.buffers[..., :3] if kwargs.get("obs") == "pixels" else self.buffers
+
+        context = multiprocessing.get_context("spawn")  # SDL не переносит fork
+        self.slices = []
+        self.conns = []
+        self.processes = []
+        for w in range(workers):
+            first = n * w // workers
+            count = n * (w + 1) // workers - first
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, self.shm.name, n, first, count, kwargs), daemon=True)
+            process.start()
+            self.slices.append(slice(first, first + count))
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def reset(self, seed=0):
+        for conn in self.conns:
+            conn.send(("reset", seed))
+        for conn in self.conns:
+            conn.recv()
+        return self.observations
+
+    # Возвращает (наблюдения, награды, конец игры, обрезка, infos)
+    def step(self, actions):
+        for conn, part in zip(self.conns, self.slices):
+            conn.send(("step", actions[part]))
+        results = [conn.recv() for conn in self.conns]
+        rewards = np.concatenate([r[0] for r in results])
+        terminated = np.concatenate([r[1] for r in results])
+        truncated = np.concatenate([r[2] for r in results])
+        infos = [info for r in results for info in r[3]]
+        return self.observations, rewards, terminated, truncated, infos
+
+    def close(self):
+        for conn in self.conns:
+            conn.send(("close", None))
+        for process in self.processes:
+            process.join()
+        del self.observations, self.buffers
+        self.shm.close()
+        self.shm.unlink()
+
+
+# Замер: случайные действия, шагов в секунду суммарно по всем окружениям
+def measure(n, workers, steps, **kwargs):
+    env = VectorEnv(n, workers, **kwargs)
+    try:
+        env.reset(0)
+        rng = np.random.default_rng(0)
+        actions = rng.integers(0, ACTION_COUNT, size=(steps, n))
+        start = time.perf_counter()
+        for i in range(steps):
+            env.step(actions[i])
+        elapsed = time.perf_counter() - start
+    finally:
+        env.close()
+    return n * steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Векторное окружение Mario Parkour: замер шагов в секунду")
+    parser.add_argument("--envs", type=int, default=16, help="число окружений")
+    parser.add_argument("--workers", type=int, nargs="+", help="число процессов (несколько — сравнение)")
+    parser.add_argument("--steps", type=int, default=500, help="шагов каждого окружения")
+    parser.add_argument("--obs", choices=OBSERVATIONS, default="features")
+    parser.add_argument("--size", type=int, nargs=2, default=PIXELS_SIZE, metavar=("W", "H"), help="размер картинки")
+    parser.add_argument("--entities", choices=ENTITY_STORES, default="sprites")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    for workers in args.workers or sorted({1, cores}):
+        rate = measure(args.envs, workers, args.steps, obs=args.obs, size=tuple(args.size), entities=args.entities)
+        print(f"envs={args.envs} workers={workers} obs={args.obs} steps/s={rate:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import random
+import time
+
+# Без окна и без звука
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from settings import INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+from replay import Replay, save_run
+from world import GameWorld, ENTITY_STORES, generator_params
+
+
+# Простой бот: всегда прыгает и тянется к ближайшей платформе выше себя
+def climber_policy(world):
+    player = world.player
+    target = None
+    for plat in world.platforms:
+        if plat.rect.top < player.rect.bottom - 1:
+            if target is None or plat.rect.top > target.rect.top:
+                target = plat
+    inputs = INPUT_JUMP
+    if target is not None:
+        if target.rect.centerx < player.rect.centerx - 10:
+            inputs |= INPUT_LEFT
+        elif target.rect.centerx > player.rect.centerx + 10:
+            inputs |= INPUT_RIGHT
+    return inputs
+
+
+# Случайный бот на собственном генераторе
+def random_policy(seed):
+    rng = random.Random(seed)
+
+    def policy(world):
+        return rng.randrange(8)
+
+    return policy
+
+
+# Прогон одного эпизода без ограничения по скорости
+def run_episode(seed, policy, max_ticks, entities="sprites", recording=None):
+    world = GameWorld(seed, entities=entities)
+    while not world.game_over and world.tick < max_ticks:
+        inputs = policy(world)
+        if recording is not None:
+            recording.record(inputs)
+        world.step(inputs)
+    if recording is not None:
+        recording.finish(world)
+    return world
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Безголовый прогон симуляции Mario Parkour")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--episodes", type=int, default=1)
+    parser.add_argument("--max-ticks", type=int, default=100000)
+    parser.add_argument("--policy", choices=["climber", "random"], default="climber")
+    parser.add_argument("--entities", choices=ENTITY_STORES, default="sprites",
+                        help="хранение монеток и врагов: спрайты или массивы NumPy")
+    parser.add_argument("--record", metavar="DIR", help="сохранить записи эпизодов для replay.py verify")
+    args = parser.parse_args()
+
+    total_ticks = 0
+    start = time.perf_counter()
+    for episode in range(args.episodes):
+        seed = args.seed + episode
+        policy = climber_policy if args.policy == "climber" else random_policy(seed)
+        recording = Replay(seed, generator_params()) if args.record else None
+        world = run_episode(seed, policy, args.max_ticks, args.entities, recording)
+        if recording is not None and world.game_over:
+            save_run(recording, args.record)
+        total_ticks += world.tick
+        print(f"seed={seed} ticks={world.tick} score={world.score} game_over={world.game_over} allocations={world.allocations}")
+    elapsed = time.perf_counter() - start
+    print(f"{total_ticks} ticks in {elapsed:.2f} s ({total_ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import functools
+import math
+import random
+
+from settings import WIDTH, HEIGHT
+
+# Размер одного блока платформы
+TILE = 40
+
+# Физика игрока
+GRAVITY = 0.5  # Прибавка к вертикальной скорости за тик
+JUMP_POWER = -15  # Скорость в начале прыжка
+PLAYER_SPEED = 5  # Пикселей за тик по горизонтали
+
+# Параметры генерации уровня по умолчанию (их перебирает balance.py)
+LEVEL_PARAMS = {
+    "enemy_spawn_chance": 0.3,  # Базовый шанс появления врага на платформе
+    "enemy_ramp": 0.01,  # Прибавка к шансу за каждый чанк высоты
+    "gap_min": 80,  # Расстояние между платформами по высоте
+    "gap_max": 120,
+    "width_min": 3,  # Ширина платформы в блоках
+    "width_max": 5,
+    "coin_chance": 0.5,  # Шанс монетки на платформе
+}
+
+# Версия генератора: меняется вместе с раскладкой уровня при том же сиде
+LEVEL_VERSION = 2
+
+# Уровень делится на чанки по высоте. Первая платформа чанка —
+# «опорная» — лежит ровно на его нижней границе и закрывает центральный
+# столбец экрана; стартовая платформа — опорная платформа чанка 0.
+CHUNK_HEIGHT = 600
+CHUNK_BASE = HEIGHT - 50  # Мировая y верха стартовой платформы
+CENTER = WIDTH // 2
+
+# Стартовая платформа: x и ширина в блоках
+START_PLATFORM = (20, 19)
+
+# Наибольший сдвиг левого края платформы относительно предыдущей
+SPREAD = 200
+
+
+# Последний тик прыжка, на котором игрок еще может приземлиться на
+# платформу, чей верх на rise пикселей выше верха исходной, или None,
+# если ее не достать. Повторяет Player.update и BandIndex.sweep_down:
+# посадка идет при падении, пока пройденная за тик полоса задевает
+# платформу; до этого тика игрок успевает сдвинуться по горизонтали.
+@functools.lru_cache(maxsize=None)
+def landing_tick(rise, jump_power=JUMP_POWER, gravity=GRAVITY, height=TILE):
+    y = 0.0  # Смещение игрока от положения стоя на исходной платформе
+    vel_y = jump_power
+    prev_bottom = 0
+    tick = 0
+    last = None
+    while True:
+        tick += 1
+        vel_y += gravity
+        y += vel_y
+        bottom = math.floor(y + 0.5)  # Округление rect.y при y > 0
+        if vel_y > 0:
+            top = min(bottom, prev_bottom) - height
+            if top >= -rise + height:
+                return last  # Игрок ушел ниже платформы
+            if bottom > -rise:
+                last = tick
+        prev_bottom = bottom
+
+
+# Наибольшая высота, на которую можно запрыгнуть
+@functools.lru_cache(maxsize=None)
+def max_rise(jump_power=JUMP_POWER, gravity=GRAVITY):
+    rise = 0
+    while landing_tick(rise + 1, jump_power, gravity) is not None:
+        rise += 1
+    return rise
+
+
+# Горизонтальный зазор между платформами, который нужно пролететь
+# в прыжке (игрок шириной в блок стоит где угодно на исходной)
+def shift(left, right, other_left, other_right):
+    return max(0, other_left - right - (TILE - 2), left - other_right - (TILE - 2))
+
+
+# Можно ли прыжком с платформы lower попасть на платформу upper
+# (по прямоугольникам)
+def reachable(lower, upper, speed=PLAYER_SPEED, jump_power=JUMP_POWER, gravity=GRAVITY):
+    ticks = landing_tick(lower.top - upper.top, jump_power, gravity)
+    if ticks is None:
+        return False
+    return shift(lower.left, lower.right, upper.left, upper.right) <= speed * ticks
+
+
+def anchor_y(index):
+    return CHUNK_BASE - index * CHUNK_HEIGHT
+
+
+# Генератор чанка зависит только от сида мира и номера чанка.
+# Строковый сид random.Random не зависит от PYTHONHASHSEED.
+def chunk_rng(seed, index):
+    return random.Random(f"{seed}:{index}")
+
+
+# Промежутки по высоте между платформами чанка: от опорной платформы
+# до опорной платформы следующего чанка. Каждый не больше gap_max и
+# высоты прыжка; меньше gap_min бывает, только если иначе не разложить.
+def chunk_gaps(rng, params, jump_power=JUMP_POWER, gravity=GRAVITY):
+    gap_max = min(params["gap_max"], max_rise(jump_power, gravity))
+    gap_min = min(params["gap_min"], gap_max)
+    gaps = []
+    rest = CHUNK_HEIGHT
+    while rest > gap_max:
+        high = min(gap_max, rest - gap_min)
+        gap = rng.randint(gap_min, high) if high >= gap_min else rest // 2
+        gaps.append(gap)
+        rest -= gap
+    gaps.append(rest)
+    return gaps
+
+
+# Раскладка чанка: кортежи (x, y, ширина в блоках, x монетки или None,
+# скорость врага или None) снизу вверх. Каждая платформа достижима
+# с предыдущей, а последняя — с опорной платформой следующего чанка,
+# где бы та ни легла: для этого платформа j держится не дальше от
+# центрального столбца, чем игрок успеет пройти за оставшиеся прыжки.
+def chunk_layout(seed, index, params=LEVEL_PARAMS, speed=PLAYER_SPEED, jump_power=JUMP_POWER, gravity=GRAVITY):
+    rng = chunk_rng(seed, index)
+    gaps = chunk_gaps(rng, params, jump_power, gravity)
+    reach = [min(SPREAD, speed * landing_tick(gap, jump_power, gravity)) for gap in gaps]
+    # Первый экран без врагов, дальше шанс растет с каждым чанком
+    enemy_chance = params["enemy_spawn_chance"] + index * params["enemy_ramp"] if index else 0.0
+    y = anchor_y(index)
+
+    left = right = None
+    for j, gap in enumerate(gaps):
+        width = rng.randint(params["width_min"], params["width_max"])
+        size = width * TILE
+        if j == 0:
+            if index == 0:
+                x, width = START_PLATFORM
+                yield x, y, width, None, None
+                left, right = x, x + width * TILE
+                y -= gap
+                continue
+            # Опорная платформа закрывает центральный столбец
+            low, high = CENTER - size + 1, CENTER
+        else:
+            # В пределах прыжка с предыдущей платформы и SPREAD от нее...
+            low = max(left - (TILE - 2) - reach[j - 1] - size, left - SPREAD)
+            high = min(right + (TILE - 2) + reach[j - 1], left + SPREAD)
+            # ...и в пределах оставшихся прыжков от центра
+            rest = sum(reach[j:])
+            low = max(low, CENTER - (TILE - 2) - rest - size)
+            high = min(high, CENTER + 1 + (TILE - 2) + rest)
+        low = max(low, 0)
+        high = min(high, WIDTH - size)
+        x = rng.randint(low, max(low, high))
+
+        coin_x = x + rng.randint(0, size - 20) if rng.random() < params["coin_chance"] else None
+        enemy_vel = rng.choice([-3, 3]) if rng.random() < enemy_chance else None
+        yield x, y, width, coin_x, enemy_vel
+        left, right = x, x + size
+        y -= gap
+
+
+# Потоковая раскладка уровня: платформы по одной, чанк за чанком.
+# Следующий чанк начинается, когда предыдущий выдан целиком.
+class LevelStream:
+    def __init__(self, seed, params=LEVEL_PARAMS):
+        self.seed = seed
+        self.params = params
+        self.index = 0  # Номер следующего чанка
+        self.items = iter(())
+        self.top = CHUNK_BASE + 1  # Мировая y последней выданной платформы
+
+    def __next__(self):
+        item = next(self.items, None)
+        while item is None:
+            self.items = chunk_layout(self.seed, self.index, self.params)
+            self.index += 1
+            item = next(self.items, None)
+        self.top = item[1]
+        return item
+
+    def __iter__(self):
+        return self
@@ -0,0 +1,36 @@
+# Пул переиспользуемых объектов. Новый объект создается только
+# когда свободных нет; счетчик created показывает, сколько раз это
+# произошло, и в установившейся игре перестает расти.
+class Pool:
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+
+    def acquire(self, *args):
+        if self.free:
+            item = self.free.pop()
+        else:
+            item = self.factory()
+            item.pool = self
+            self.created += 1
+        item.reset(*args)
+        return item
+
+    def release(self, item):
+        self.free.append(item)
+
+    def __len__(self):
+        return len(self.free)
+
+
+# Пулы объектов уровня одного мира
+class EntityPools:
+    def __init__(self, platform_factory, coin_factory, enemy_factory):
+        self.platforms = Pool(platform_factory)
+        self.coins = Pool(coin_factory)
+        self.enemies = Pool(enemy_factory)
+
+    @property
+    def created(self):
+        return self.platforms.created + self.coins.created + self.enemies.created
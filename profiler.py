@@ -0,0 +1,163 @@
+import csv
+import json
+import sys
+from array import array
+from time import perf_counter_ns
+
+import pygame
+
+# Фазы кадра в порядке выполнения
+PHASES = ("input", "update", "collide", "spawn", "draw", "present")
+
+# Счетчики, которые снимаются в конце каждого кадра
+COUNTERS = ("steps", "sprites", "platforms", "coins", "enemies", "allocations", "blocks")
+
+# Сколько последних кадров хранится в кольцевом буфере
+CAPACITY = 4096
+
+
+# Заглушка для выключенного профилировщика: вызовы ничего не делают
+class NullProfiler:
+    enabled = False
+
+    def begin_frame(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def end_frame(self, world=None, steps=0):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+# Профилировщик кадра. mark(phase) относит время с предыдущей отметки
+# к фазе phase; в конце кадра суммы по фазам и счетчики спрайтов и
+# выделений пишутся в кольцевые буферы на CAPACITY кадров.
+class FrameProfiler:
+    enabled = True
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.columns = {name: array("q", bytes(8 * capacity)) for name in ("frame",) + PHASES + COUNTERS}
+        self.current = dict.fromkeys(PHASES, 0)
+        self.frames = 0  # Всего кадров с начала записи
+        self.info = {}  # Условия замера, например разрешение кадра
+        self.frame_start = 0
+        self.last_mark = 0
+
+    def begin_frame(self):
+        self.frame_start = self.last_mark = perf_counter_ns()
+
+    def mark(self, phase):
+        now = perf_counter_ns()
+        self.current[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self, world=None, steps=0):
+        now = perf_counter_ns()
+        slot = self.frames % self.capacity
+        columns = self.columns
+        columns["frame"][slot] = now - self.frame_start
+        current = self.current
+        for phase in PHASES:
+            columns[phase][slot] = current[phase]
+            current[phase] = 0
+        columns["steps"][slot] = steps
+        if world is not None:
+            columns["sprites"][slot] = len(world.all_sprites)
+            columns["platforms"][slot] = len(world.platforms)
+            columns["coins"][slot] = world.coin_count
+            columns["enemies"][slot] = world.enemy_count
+            columns["allocations"][slot] = world.allocations
+        columns["blocks"][slot] = sys.getallocatedblocks()
+        self.frames += 1
+
+    # Значения столбца в хронологическом порядке
+    def series(self, name):
+        column = self.columns[name]
+        if self.frames <= self.capacity:
+            return column[:self.frames]
+        slot = self.frames % self.capacity
+        return column[slot:] + column[:slot]
+
+    # Процентили времени кадра в миллисекундах
+    def percentiles(self, points=(50, 95, 99)):
+        values = sorted(self.series("frame"))
+        if not values:
+            return dict.fromkeys(points, 0.0)
+        return {p: values[min(len(values) - 1, len(values) * p // 100)] / 1e6 for p in points}
+
+    # Среднее время каждой фазы в миллисекундах
+    def phase_means(self):
+        count = min(self.frames, self.capacity) or 1
+        return {phase: sum(self.columns[phase]) / count / 1e6 for phase in PHASES}
+
+    def rows(self):
+        names = ("frame",) + PHASES + COUNTERS
+        return names, zip(*(self.series(name) for name in names))
+
+    # Запись трассы: формат выбирается по расширению (.json или .csv)
+    def dump(self, path):
+        names, rows = self.rows()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(names)
+                writer.writerows(rows)
+        else:
+            with open(path, "w") as f:
+                json.dump({
+                    "columns": names,
+                    "frames": [list(row) for row in rows],
+                    "percentiles_ms": self.percentiles(),
+                    "phase_means_ms": self.phase_means(),
+                    "info": self.info,
+                }, f)
+
+
+# Полупрозрачная панель с процентилями и разбивкой по фазам.
+# Текст пересобирается раз в refresh кадров, чтобы сама панель
+# не искажала измерения.
+class ProfilerOverlay:
+    def __init__(self, profiler, refresh=30):
+        self.profiler = profiler
+        self.refresh = refresh
+        self.font = pygame.font.Font(None, 20)
+        self.panel = None
+        self.built_at = -refresh
+
+    def _build(self, timestep):
+        profiler = self.profiler
+        p = profiler.percentiles()
+        lines = [f"frame p50 {p[50]:.2f}  p95 {p[95]:.2f}  p99 {p[99]:.2f} ms"]
+        lines.extend(f"{name} {value}" for name, value in profiler.info.items())
+        for phase, mean in profiler.phase_means().items():
+            lines.append(f"{phase:<8} {mean:.3f} ms")
+        if profiler.frames:
+            slot = (profiler.frames - 1) % profiler.capacity
+            counts = "  ".join(f"{name} {profiler.columns[name][slot]}" for name in COUNTERS[1:6])
+            lines.append(counts)
+        if timestep is not None:
+            lines.append(f"merged frames {timestep.merged_frames}  dropped steps {timestep.dropped_steps}")
+
+        surfaces = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(s.get_width() for s in surfaces) + 12
+        height = sum(s.get_height() for s in surfaces) + 12
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+        y = 6
+        for surface in surfaces:
+            panel.blit(surface, (6, y))
+            y += surface.get_height()
+        self.panel = panel
+
+    def draw(self, screen, timestep=None):
+        if self.profiler.frames - self.built_at >= self.refresh:
+            self._build(timestep)
+            self.built_at = self.profiler.frames
+        rect = self.panel.get_rect(topright=(screen.get_width() - 10, 10))
+        screen.blit(self.panel, rect)
+        return rect
@@ -0,0 +1,159 @@
+import pygame
+
+from display import Viewport
+
+# Положение счета на экране
+HUD_POS = (10, 10)
+
+
+# Текст интерфейса, который перерисовывается только при смене значения
+class HudText:
+    def __init__(self, font, template, color, pos=HUD_POS):
+        self.font = font
+        self.template = template
+        self.color = color
+        self.pos = pos
+        self.value = None
+        self.surface = None
+        self.rect = pygame.Rect(pos, (0, 0))
+
+    # Возвращает прямоугольник, который нужно обновить на экране
+    # (старый текст вместе с новым), или None, если значение то же
+    def set(self, value):
+        if value == self.value:
+            return None
+        self.value = value
+        old = self.rect
+        self.surface = self.font.render(self.template.format(value), True, self.color)
+        self.rect = self.surface.get_rect(topleft=self.pos)
+        return old.union(self.rect)
+
+    def draw(self, screen):
+        screen.blit(self.surface, self.rect)
+
+
+# Полная перерисовка кадра: фон, спрайты, счет и flip(). Кадр screen
+# может быть меньше логического экрана (см. display.Viewport); фон и
+# счет тогда уже построены под его разрешение, а текстуры берутся из
+# viewport (с кэшем ресурсов игры). output — куда выводить кадр:
+# pygame.display или display.Display.
+class FullRenderer:
+    def __init__(self, screen, background, hud, output=pygame.display, viewport=None):
+        self.screen = screen
+        self.background = background
+        self.hud = hud
+        self.output = output
+        self.viewport = viewport if viewport is not None else Viewport(screen.get_size())
+        self.pending = None  # Области для display.update(); None — весь экран
+        self.overlays = []  # Слои поверх мира (draw/project), например «призрак»
+
+    # Видимые объекты мира и слоев: ключ -> (прямоугольник в кадре, картинка)
+    def visible(self, world, alpha=1.0):
+        camera = world.camera
+        visible = {
+            sprite: (rect, sprite.image)
+            for sprite, rect in camera.project(world.all_sprites, alpha).items()
+        }
+        for layer in world.stores + tuple(self.overlays):
+            visible.update(layer.project(camera, alpha))
+        return self.viewport.project(visible)
+
+    # alpha — доля шага симуляции для интерполяции позиций
+    def draw(self, world, alpha=1.0):
+        self.hud.set(world.score)
+        self.background.draw(self.screen)  # Небо с облаками
+        if self.viewport.native:
+            world.camera.draw(self.screen, world.all_sprites, alpha)  # Отрисовка видимых спрайтов
+            for layer in world.stores + tuple(self.overlays):  # Монетки и враги из массивов, слои
+                layer.draw(self.screen, world.camera, alpha)
+        else:
+            self.screen.blits([(image, rect) for rect, image in self.visible(world, alpha).values()], False)
+        self.hud.draw(self.screen)  # Отображение счета
+        self.pending = None
+
+    # Вывод кадра на экран; extra — области, дорисованные поверх кадра
+    def present(self, extra=()):
+        if self.pending is None:
+            self.output.flip()
+        elif self.pending or extra:
+            self.output.update(self.pending + list(extra))
+
+    # Следующий кадр обязан быть полным (после меню и т.п.)
+    def invalidate(self):
+        pass
+
+
+# Отрисовка только изменившихся областей. Запоминает, где и с какой
+# картинкой был нарисован каждый спрайт; на следующем кадре под
+# сдвинутыми спрайтами восстанавливается фон, и в display.update()
+# передаются только эти прямоугольники. Области, дорисованные поверх
+# прошлого кадра (extra в present(), например панель профилировщика),
+# тоже восстанавливаются. Если сдвинулась камера или фон, кадр
+# перерисовывается полностью.
+class DirtyRenderer(FullRenderer):
+    def __init__(self, screen, background, hud, output=pygame.display, viewport=None):
+        super().__init__(screen, background, hud, output, viewport)
+        self.drawn = {}  # спрайт -> (экранный прямоугольник, картинка)
+        self.camera_offset = None
+        self.covered = []  # Области, дорисованные поверх прошлого кадра
+        self.full_frames = 0
+        self.dirty_frames = 0
+
+    def invalidate(self):
+        self.camera_offset = None
+
+    def draw(self, world, alpha=1.0):
+        offset = round(world.camera.view_y(alpha))
+        visible = self.visible(world, alpha)
+        hud_rect = self.hud.set(world.score)
+
+        if offset != self.camera_offset or self.background.moved:
+            self.camera_offset = offset
+            self.drawn = visible
+            self.full_frames += 1
+            super().draw(world, alpha)
+            return
+
+        # Области, где спрайт исчез, сдвинулся или сменил кадр
+        dirty = []
+        for sprite, (rect, image) in visible.items():
+            old = self.drawn.get(sprite)
+            if old is None:
+                dirty.append(rect)
+            elif old[0] != rect or old[1] is not image:
+                if old[0].colliderect(rect):
+                    dirty.append(old[0].union(rect))
+                else:
+                    dirty.append(old[0])
+                    dirty.append(rect)
+        for sprite, (rect, image) in self.drawn.items():
+            if sprite not in visible:
+                dirty.append(rect)
+        if hud_rect is not None:
+            dirty.append(hud_rect)
+        dirty.extend(self.covered)
+        self.drawn = visible
+        self.dirty_frames += 1
+        self.pending = dirty
+        if not dirty:
+            return
+
+        # Фон и спрайты перерисовываются с отсечением по каждой области
+        screen = self.screen
+        for area in dirty:
+            screen.set_clip(area)
+            self.background.draw(screen)
+            screen.blits([(image, rect) for rect, image in visible.values() if rect.colliderect(area)], False)
+            if area.colliderect(self.hud.rect):
+                self.hud.draw(screen)
+        screen.set_clip(None)
+
+    def present(self, extra=()):
+        self.covered = list(extra)
+        super().present(extra)
+
+
+RENDERERS = {
+    "full": FullRenderer,
+    "dirty": DirtyRenderer,
+}
@@ -0,0 +1,344 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+
+import pygame
+
+from assets import AssetManager, game_textures
+from background import CloudBackground
+from level import LEVEL_PARAMS
+from render import FullRenderer, HudText
+from settings import WIDTH, HEIGHT, FPS, BLACK, WHITE
+from timestep import FixedTimestep
+from world import GameWorld, generator_params
+
+# Заголовок файла записи: сигнатура, версия, сид, длина забега в тиках
+# и итоговый счет; дальше параметры генератора (JSON) и серии ввода
+MAGIC = b"MPRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBQII")
+
+# Прозрачность «призрака» лучшего забега
+GHOST_ALPHA = 110
+
+# Шаг перемотки в тиках (5 секунд) и скорости ускоренного просмотра
+SEEK_TICKS = 300
+SPEEDS = (1, 2, 4, 8)
+
+
+# Целое без знака переменной длины (по 7 бит в байте)
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+# Запись забега: сид, параметры генератора и маска ввода на каждый тик,
+# сжатая сериями (маска, сколько тиков подряд). Ввод меняется редко,
+# поэтому минута игры занимает десятки-сотни байт.
+class Replay:
+    def __init__(self, seed, params=None):
+        self.seed = seed
+        self.params = params if params is not None else generator_params()
+        self.runs = []  # [маска, число тиков]
+        self.ticks = 0  # Тик проигрыша (длина забега)
+        self.score = 0
+
+    def record(self, inputs):
+        if self.runs and self.runs[-1][0] == inputs:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([inputs, 1])
+
+    def finish(self, world):
+        self.ticks = world.tick
+        self.score = world.score
+
+    # Маски ввода по тикам
+    def inputs(self):
+        for inputs, count in self.runs:
+            for _ in range(count):
+                yield inputs
+
+    def __len__(self):
+        return sum(count for _, count in self.runs)
+
+    def encode(self):
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, self.ticks, self.score))
+        params = json.dumps(self.params, sort_keys=True).encode()
+        write_varint(out, len(params))
+        out += params
+        write_varint(out, len(self.runs))
+        for inputs, count in self.runs:
+            out.append(inputs)
+            write_varint(out, count)
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data):
+        magic, version, seed, ticks, score = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("не файл записи Mario Parkour или неизвестная версия")
+        pos = HEADER.size
+        size, pos = read_varint(data, pos)
+        replay = cls(seed, json.loads(data[pos:pos + size]))
+        pos += size
+        count, pos = read_varint(data, pos)
+        for _ in range(count):
+            inputs = data[pos]
+            run, pos = read_varint(data, pos + 1)
+            replay.runs.append([inputs, run])
+        replay.ticks = ticks
+        replay.score = score
+        return replay
+
+    # Запись во временный файл и замена, чтобы не оставить обрывок
+    def save(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.encode())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.decode(f.read())
+
+
+# Повтор забега без отрисовки и без ограничения скорости.
+# Возвращает мир после последнего тика записи.
+def simulate(replay, world=None, ticks=None):
+    if world is None:
+        world = GameWorld(params=level_params(replay))
+    world.reset(replay.seed)
+    for i, inputs in enumerate(replay.inputs()):
+        if ticks is not None and i >= ticks:
+            break
+        world.step(inputs)
+    return world
+
+
+# Параметры генерации уровня, с которыми сделана запись
+def level_params(replay):
+    return {name: replay.params[name] for name in LEVEL_PARAMS if name in replay.params}
+
+
+# Расхождение физики и версии генератора записи с текущими или None.
+# Параметры генерации уровня берутся из записи и расхождением не считаются.
+def params_mismatch(replay):
+    current = generator_params(level_params(replay))
+    if replay.params != current:
+        return f"параметры генератора: {replay.params} != {current}"
+    return None
+
+
+# Проверка записи: тот же счет и тот же тик проигрыша. Уровень строится
+# с параметрами из записи, а физика и набор параметров должны совпадать
+# с текущей версией. Возвращает список расхождений (пустой — запись
+# воспроизводится точно).
+def verify(replay):
+    problems = []
+    mismatch = params_mismatch(replay)
+    if mismatch is not None:
+        problems.append(mismatch)
+    world = simulate(replay)
+    if world.score != replay.score:
+        problems.append(f"счет {world.score} != {replay.score}")
+    if world.tick != replay.ticks or not world.game_over:
+        problems.append(f"проигрыш на тике {world.tick if world.game_over else None} != {replay.ticks}")
+    return problems
+
+
+# «Призрак»: забег из записи, который идет параллельно живому игроку
+# в своем мире и рисуется полупрозрачным поверх кадра. Подключается к
+# отрисовщику как слой (draw/project, как хранилища в entities.py).
+class Ghost:
+    def __init__(self, replay, textures):
+        self.replay = replay
+        self.world = GameWorld(replay.seed, textures, params=level_params(replay))
+        self.images = {}  # Кадр игрока -> полупрозрачная копия
+        self.reset()
+
+    def reset(self):
+        self.world.reset(self.replay.seed)
+        self.inputs = self.replay.inputs()
+
+    def step(self):
+        if not self.world.game_over:
+            self.world.step(next(self.inputs, 0))
+
+    def _image(self, image):
+        ghost = self.images.get(image)
+        if ghost is None:
+            ghost = image.copy()
+            ghost.set_alpha(GHOST_ALPHA)
+            self.images[image] = ghost
+        return ghost
+
+    def project(self, camera, alpha=1.0):
+        player = self.world.player
+        if self.world.game_over:
+            return {}
+        rect = camera.screen_rect(player, round(camera.view_y(alpha)), alpha)
+        if not (rect.bottom > 0 and rect.top < camera.height):
+            return {}
+        return {self: (rect, self._image(player.image))}
+
+    def draw(self, surface, camera, alpha=1.0):
+        surface.blits([(image, rect) for rect, image in self.project(camera, alpha).values()], False)
+
+
+# Запись из аргумента командной строки («призрак» или просмотр):
+# файл должен читаться и строить тот же уровень, что и текущая версия игры
+def current_replay(path):
+    try:
+        replay = Replay.load(path)
+    except (OSError, ValueError, struct.error) as error:
+        raise argparse.ArgumentTypeError(f"{path}: {error}")
+    mismatch = params_mismatch(replay)
+    if mismatch is not None:
+        raise argparse.ArgumentTypeError(f"{path}: запись другой версии игры, {mismatch}")
+    return replay
+
+
+# Лучший забег в папке записей: best.mprp обновляется, если новый счет выше
+def save_run(replay, directory):
+    os.makedirs(directory, exist_ok=True)
+    name = time.strftime("%Y%m%d-%H%M%S") + f"-{replay.seed}-{replay.score}.mprp"
+    replay.save(os.path.join(directory, name))
+    best = os.path.join(directory, "best.mprp")
+    try:
+        best_score = Replay.load(best).score
+    except (OSError, ValueError, struct.error):
+        best_score = -1
+    if replay.score > best_score:
+        replay.save(best)
+
+
+# Просмотр записи в окне: ←/→ — перемотка на 5 секунд, 1-4 — скорость
+# x1/x2/x4/x8, пробел — пауза, Esc — выход. Перемотка назад заново
+# проигрывает запись без отрисовки до нужного тика.
+def view(replay, ghost_replay=None):
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Mario Parkour — replay")
+    assets = AssetManager()
+    textures = game_textures(assets)
+    font = assets.font("font/supermario_font.otf", 32)
+    small = pygame.font.Font(None, 24)
+    renderer = FullRenderer(screen, CloudBackground(assets), HudText(font, "Score: {}", BLACK))
+    world = GameWorld(replay.seed, textures, params=level_params(replay))
+    inputs = list(replay.inputs())
+    ghost = Ghost(ghost_replay, textures) if ghost_replay is not None else None
+    if ghost is not None:
+        renderer.overlays.append(ghost)
+
+    def seek(tick):
+        tick = max(0, min(len(inputs), tick))
+        if tick < world.tick:
+            world.reset(replay.seed)
+            if ghost is not None:
+                ghost.reset()
+        while world.tick < tick and not world.game_over:
+            world.step(inputs[world.tick])
+            if ghost is not None:
+                ghost.step()
+
+    clock = pygame.time.Clock()
+    timestep = FixedTimestep()
+    speed = 1
+    paused = False
+    running = True
+    while running:
+        clock.tick(FPS)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    seek(world.tick + SEEK_TICKS)
+                elif event.key == pygame.K_LEFT:
+                    seek(world.tick - SEEK_TICKS)
+                elif pygame.K_1 <= event.key < pygame.K_1 + len(SPEEDS):
+                    speed = SPEEDS[event.key - pygame.K_1]
+
+        steps = timestep.advance() * speed
+        if paused:
+            steps = 0
+        for _ in range(steps):
+            if world.game_over or world.tick >= len(inputs):
+                break
+            world.step(inputs[world.tick])
+            if ghost is not None:
+                ghost.step()
+            renderer.background.update(world.player.vel_y)
+
+        renderer.draw(world, timestep.alpha if steps else 1.0)
+        status = f"tick {world.tick}/{len(inputs)}  x{speed}{'  paused' if paused else ''}"
+        screen.blit(small.render(status, True, WHITE), (10, HEIGHT - 24))
+        renderer.present()
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Записи забегов Mario Parkour")
+    commands = parser.add_subparsers(dest="command", required=True)
+    check = commands.add_parser("verify", help="проиграть записи без окна и сверить счет и тик проигрыша")
+    check.add_argument("files", nargs="+")
+    info = commands.add_parser("info", help="сид, длина, счет и размер записи")
+    info.add_argument("files", nargs="+")
+    show = commands.add_parser("view", help="посмотреть запись в окне")
+    show.add_argument("file", type=current_replay)
+    show.add_argument("--ghost", type=current_replay, metavar="FILE",
+                      help="показать рядом «призрак» другого забега на том же уровне")
+    args = parser.parse_args()
+
+    if args.command == "view":
+        # Призрак идет в своем мире: на другом уровне он летал бы мимо платформ
+        ghost = args.ghost
+        if ghost is not None and (ghost.seed, level_params(ghost)) != (args.file.seed, level_params(args.file)):
+            parser.error(f"«призрак» записан на другом уровне: сид {ghost.seed} != {args.file.seed} "
+                         "или другие параметры генерации")
+        view(args.file, ghost)
+        return 0
+
+    failed = 0
+    start = time.perf_counter()
+    ticks = 0
+    for path in args.files:
+        replay = Replay.load(path)
+        if args.command == "info":
+            print(f"{path}: seed={replay.seed} ticks={replay.ticks} score={replay.score} "
+                  f"runs={len(replay.runs)} bytes={os.path.getsize(path)}")
+            continue
+        problems = verify(replay)
+        ticks += len(replay)
+        print(f"{path}: {'FAIL ' + '; '.join(problems) if problems else 'ok'}")
+        failed += bool(problems)
+    if args.command == "verify":
+        elapsed = time.perf_counter() - start
+        print(f"{len(args.files) - failed}/{len(args.files)} ok, {ticks} ticks in {elapsed:.2f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,419 @@
+import time
+from array import array
+
+import pygame
+
+from settings import (
+    WIDTH, HEIGHT, FPS, TICK_RATE, WHITE, BLACK,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP,
+)
+from background import CloudBackground
+from profiler import FrameProfiler, ProfilerOverlay
+from render import HudText, RENDERERS, HUD_POS
+from replay import Replay, Ghost, level_params, save_run
+from stats import frame_summary
+from timestep import FixedTimestep
+from world import GameWorld, generator_params
+
+
+# Считывание клавиш в битовую маску ввода
+def read_inputs():
+    keys = pygame.key.get_pressed()
+    inputs = 0
+    if keys[pygame.K_LEFT]:
+        inputs |= INPUT_LEFT
+    if keys[pygame.K_RIGHT]:
+        inputs |= INPUT_RIGHT
+    if keys[pygame.K_SPACE]:
+        inputs |= INPUT_JUMP
+    return inputs
+
+
+# События окна, после которых игра ставится на паузу и глушит звук
+FOCUS_LOST_EVENTS = (pygame.WINDOWFOCUSLOST, pygame.WINDOWMINIMIZED)
+FOCUS_GAINED_EVENTS = (pygame.WINDOWFOCUSGAINED, pygame.WINDOWRESTORED)
+
+# События, после которых окно нужно перерисовать
+EXPOSE_EVENTS = (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE)
+
+
+# Базовая сцена: получает события, обновляется и рисует кадр.
+# Сцена с idle = True не крутит цикл, а ждет событий в event.wait().
+class Scene:
+    fps = FPS
+    idle = False
+    music = True  # Играет ли фоновая музыка в этой сцене
+
+    def __init__(self, game):
+        self.game = game
+
+    def enter(self, **kwargs):
+        pass
+
+    def handle(self, event):
+        pass
+
+    def update(self):
+        pass
+
+
+# Меню: фон и четыре строки текста по центру. Экран рисуется один
+# раз при входе (и после перекрытия окна), а дальше сцена спит до
+# следующего события.
+class MenuScene(Scene):
+    idle = True
+    background_path = None
+    keys = {}  # клавиша -> имя следующей сцены (None — выход)
+
+    def lines(self):
+        return []
+
+    def enter(self, **kwargs):
+        self.refresh()
+
+    # Строки рендерятся заново, когда меняются данные (например, рекорд
+    # пришел из фоновой загрузки, когда меню уже на экране)
+    def refresh(self):
+        font = self.game.font
+        self.texts = [font.render(line, True, WHITE) for line in self.lines()]
+        self.needs_draw = True
+
+    def handle(self, event):
+        if event.type in EXPOSE_EVENTS:
+            self.needs_draw = True
+        elif event.type == pygame.KEYDOWN and event.key in self.keys:
+            target = self.keys[event.key]
+            if target is None:
+                self.game.running = False
+            elif isinstance(target, tuple):
+                self.game.switch(*target)  # (сцена, продолжить забег)
+            else:
+                self.game.switch(target)
+
+    def draw_background(self, screen):
+        viewport = self.game.viewport
+        screen.fill(WHITE)
+        screen.blit(self.game.assets.image(self.background_path, None if viewport.native else viewport.size), (0, 0))
+
+    def update(self):
+        if not self.needs_draw:
+            return
+        self.needs_draw = False
+        screen = self.game.screen
+        self.draw_background(screen)
+        offsets = (HEIGHT // 3, HEIGHT // 2 - 50, HEIGHT // 2, HEIGHT // 2 + 50)
+        for text, y in zip(self.texts, offsets):
+            x, y = self.game.viewport.point(WIDTH // 2, y)
+            screen.blit(text, (x - text.get_width() // 2, y))
+        self.game.display.flip()
+
+
+# Стартовое меню. Оно показывается сразу после запуска, пока
+# остальные ресурсы грузятся в фоне; снизу рисуется полоса загрузки.
+# Если S нажата раньше, забег начнется, как только загрузка закончится.
+class StartMenu(MenuScene):
+    background_path = "sprites/bg_loader.png"
+    keys = {pygame.K_s: "play", pygame.K_q: None}
+
+    def lines(self):
+        return ["Mario Parkour", f"High Score: {self.game.highscore}", "Press S to Start", "Press Q to Quit"]
+
+    def enter(self, **kwargs):
+        self.waiting = False
+        super().enter()
+
+    def handle(self, event):
+        game = self.game
+        if game.loader is not None and event.type == game.loader.event_type:
+            self.needs_draw = True
+            if self.waiting and game.ready:
+                game.switch("play")
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_s and not game.ready:
+            self.waiting = True
+        else:
+            super().handle(event)
+
+    def draw_background(self, screen):
+        super().draw_background(screen)
+        loader = self.game.loader
+        if loader is not None and not self.game.ready:
+            bar = self.game.viewport.rect(pygame.Rect(WIDTH // 4, HEIGHT - 60, WIDTH // 2, 12))
+            pygame.draw.rect(screen, WHITE, bar, 2)
+            fill = bar.inflate(-6, -6)
+            fill.width = round(fill.width * loader.progress)
+            pygame.draw.rect(screen, WHITE, fill)
+
+
+# Меню после проигрыша (забег уже отдан в фоновую запись статистики)
+class GameOverMenu(MenuScene):
+    background_path = "sprites/bg_lose.png"
+    keys = {pygame.K_r: "play", pygame.K_q: None}
+    music = False
+
+    def lines(self):
+        return ["Game Over", f"Score: {self.game.world.score}", "Press R to Restart", "Press Q to Quit"]
+
+    def enter(self, **kwargs):
+        game = self.game
+        game.highscore = max(game.highscore, game.world.score)
+        super().enter()
+
+
+# Пауза поверх последнего кадра забега. Симуляция и все звуки стоят,
+# цикл спит в event.wait(), пока пауза не снята.
+class PauseMenu(MenuScene):
+    keys = {pygame.K_p: ("play", True), pygame.K_ESCAPE: ("play", True), pygame.K_q: None}
+    music = False
+
+    def lines(self):
+        return ["Paused", f"Score: {self.game.world.score}", "Press P to Resume", "Press Q to Quit"]
+
+    def enter(self, **kwargs):
+        pygame.mixer.pause()
+        self.frame = self.game.screen.copy()  # Последний кадр забега
+        self.frame.fill((90, 90, 90), special_flags=pygame.BLEND_MULT)  # Затемнение
+        super().enter()
+
+    def draw_background(self, screen):
+        screen.blit(self.frame, (0, 0))
+
+
+# Забег. Мир, фон и отрисовщик создаются один раз на всю игру,
+# а при входе в сцену мир только сбрасывается (объекты — в пулы).
+class PlayScene(Scene):
+    def __init__(self, game):
+        super().__init__(game)
+        options = game.options
+        self.fps = options.fps
+        self.world = game.world
+
+        # Создание фона с облаками. При отрисовке изменившихся областей
+        # облака не дрейфуют, а по вертикали фон сдвигается вслед за
+        # камерой, а не за скоростью игрока: так он двигается только
+        # в кадрах, которые и так рисуются полностью.
+        # Фон и счет строятся сразу под внутреннее разрешение кадра.
+        viewport = game.viewport
+        scale = (viewport.scale_x, viewport.scale_y)
+        self.camera_background = options.renderer == "dirty"
+        self.background = CloudBackground(game.assets, drift=0 if self.camera_background else 1, scale=scale)
+        score_hud = HudText(game.font, "Score: {}", BLACK, viewport.point(*HUD_POS))
+        self.renderer = RENDERERS[options.renderer](game.screen, self.background, score_hud, game.display, viewport)
+
+        # Симуляция идет фиксированными тиками, отрисовка — с частотой fps
+        # (0 — без ограничения), позиции интерполируются между тиками
+        self.timestep = FixedTimestep()
+        self.overlay = None
+        self.frame_times = array("f")  # Время работы кадров забега, мс
+
+        # Запись забегов и «призрак» лучшего забега на том же уровне
+        self.recording = None
+        self.ghost = None
+        if options.ghost is not None:
+            self.ghost = Ghost(options.ghost, game.world.textures)
+            self.renderer.overlays.append(self.ghost)
+
+    # resume — продолжение после паузы без сброса мира
+    def enter(self, resume=False):
+        if resume:
+            pygame.mixer.unpause()
+        else:
+            self.world.reset(self.ghost.replay.seed if self.ghost else None)
+            if self.ghost:
+                self.ghost.reset()
+            if self.game.options.record:
+                self.recording = Replay(self.world.seed, generator_params(self.world.params))
+            del self.frame_times[:]
+        self.attach(self.game.options.profiler)
+        self.timestep.reset()
+        self.renderer.invalidate()
+
+    # Замеры кадра подписываются разрешением, в котором он рисуется
+    def attach(self, profiler):
+        self.world.profiler = profiler
+        if profiler.enabled:
+            profiler.info["resolution"] = self.game.display.describe()
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_p, pygame.K_ESCAPE):
+            self.game.switch("pause")
+        elif event.type in FOCUS_LOST_EVENTS:
+            self.game.switch("pause")  # Окно свернуто или неактивно
+        # F3 включает профилировщик и панель с замерами
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            options = self.game.options
+            if not options.profiler.enabled:
+                options.profiler = FrameProfiler()
+                self.attach(options.profiler)
+            self.overlay = None if self.overlay else ProfilerOverlay(options.profiler)
+            self.renderer.invalidate()
+
+    def update(self):
+        start = time.perf_counter()
+        world = self.world
+        profiler = world.profiler
+        profiler.begin_frame()
+        inputs = read_inputs()
+        profiler.mark("input")
+
+        steps = self.timestep.advance()
+        for _ in range(steps):
+            # Шаг симуляции
+            if self.recording is not None:
+                self.recording.record(inputs)
+            if self.ghost is not None:
+                self.ghost.step()
+            for sim_event in world.step(inputs):
+                self.game.sounds[sim_event].play()
+
+            # Обновление фона с облаками
+            if self.camera_background:
+                self.background.update(world.camera.y - world.camera.prev_y)
+            else:
+                self.background.update(world.player.vel_y)
+            if world.game_over:
+                break
+
+        # Отрисовка
+        self.renderer.draw(world, self.timestep.alpha)
+        extra = [self.overlay.draw(self.game.screen, self.timestep)] if self.overlay else []
+        profiler.mark("draw")
+        self.renderer.present(extra)
+        profiler.mark("present")
+        profiler.end_frame(world, steps)
+        self.frame_times.append((time.perf_counter() - start) * 1000)
+
+        if world.game_over:
+            if self.recording is not None:
+                self.recording.finish(world)
+                save_run(self.recording, self.game.options.record)
+                self.recording = None
+            self.game.record_run(self.run_stats())
+            self.game.switch("game_over")
+
+    # Итог забега для stats.StatsStore
+    def run_stats(self):
+        world = self.world
+        return {
+            "finished_at": time.time(),
+            "seed": world.seed,
+            "score": world.score,
+            "height": world.height,
+            "coins": world.coins_collected,
+            "death": world.death,
+            "ticks": world.tick,
+            "duration_s": world.tick / TICK_RATE,
+            "resolution": self.game.display.describe(),
+            **frame_summary(self.frame_times),
+        }
+
+
+# Машина состояний игры: меню -> забег -> конец -> забег ... Вместо
+# рекурсивного перезапуска main() сцены переключаются в одном цикле,
+# а ресурсы, пулы и фон живут все время работы игры. Для меню нужны
+# только шрифт (под разрешение кадра) и его фон; мир и сцена забега
+# создаются в set_assets(), когда готовы текстуры и звуки (сразу или
+# из фонового загрузчика). Рекорд приходит из загрузчика (задание
+# highscore), а забеги пишет в фоне stats (None — не сохранять).
+class Game:
+    def __init__(self, display, assets, font, options, stats=None):
+        self.display = display  # display.Display: окно и кадр во внутреннем разрешении
+        self.screen = display.target
+        self.viewport = display.viewport
+        self.assets = assets
+        self.font = font
+        self.options = options
+        self.stats = stats
+        self.highscore = 0
+        self.clock = pygame.time.Clock()
+        self.world = None
+        self.sounds = None  # Звуки событий симуляции
+        self.loader = None
+        self.scenes = {
+            "menu": StartMenu(self),
+            "game_over": GameOverMenu(self),
+            "pause": PauseMenu(self),
+        }
+        self.scene = None
+        self.running = True
+        self.focused = True
+
+    # С «призраком» живой мир строится с параметрами уровня его записи
+    def set_assets(self, textures, sounds):
+        ghost = self.options.ghost
+        params = level_params(ghost) if ghost is not None else None
+        self.world = GameWorld(textures=textures, entities=self.options.entities, params=params)
+        self.sounds = sounds
+        self.scenes["play"] = PlayScene(self)
+
+    # Фоновая загрузка: задания textures, sounds и highscore из AssetLoader
+    def load(self, loader):
+        self.loader = loader.start()
+
+    @property
+    def ready(self):
+        return "play" in self.scenes
+
+    def _progress(self, event):
+        if event.error is not None:
+            raise event.error
+        results = self.loader.results
+        highscore = max(self.highscore, results.get("highscore", 0))
+        if highscore != self.highscore:
+            self.highscore = highscore
+            if isinstance(self.scene, MenuScene):
+                self.scene.refresh()
+        # Забег можно начинать, как только есть текстуры и звуки,
+        # не дожидаясь остальных заданий (например, чтения рекорда)
+        if not self.ready and "textures" in results and "sounds" in results:
+            self.set_assets(results["textures"], results["sounds"])
+
+    # Запись забега не ждет диска: только постановка в очередь
+    def record_run(self, run):
+        if self.stats is not None:
+            self.stats.record(run)
+
+    def switch(self, name, resume=False):
+        self.scene = self.scenes[name]
+        self.scene.enter(resume=resume)
+        if self.scene.music and self.focused:
+            pygame.mixer.music.unpause()
+        else:
+            pygame.mixer.music.pause()
+
+    # Потеря фокуса глушит звук; забег при этом сам уходит на паузу
+    def _focus(self, event):
+        if event.type in FOCUS_LOST_EVENTS:
+            self.focused = False
+            pygame.mixer.music.pause()
+            pygame.mixer.pause()
+        elif event.type in FOCUS_GAINED_EVENTS:
+            self.focused = True
+            if self.scene.music:
+                pygame.mixer.music.unpause()
+            if self.scene is not self.scenes["pause"]:
+                pygame.mixer.unpause()
+
+    # Одна итерация цикла для уже полученных событий
+    def frame(self, events):
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.running = False
+                return
+            if self.loader is not None and event.type == self.loader.event_type:
+                self._progress(event)
+            self._focus(event)
+            self.scene.handle(event)
+        self.scene.update()
+
+    def run(self, first="menu"):
+        if self.scene is None:
+            self.switch(first)
+        while self.running:
+            if self.scene.idle:
+                # Ждать события без опроса: процессор простаивает
+                events = [pygame.event.wait()]
+                events.extend(pygame.event.get())
+            else:
+                self.clock.tick(self.scene.fps)
+                events = pygame.event.get()
+            self.frame(events)
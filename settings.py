@@ -0,0 +1,23 @@
+# Настройки окна
+WIDTH, HEIGHT = 800, 600
+FPS = 60  # Ограничение частоты кадров по умолчанию
+
+# Частота шагов симуляции: под нее подобраны скорости и гравитация
+TICK_RATE = 60
+
+# Цвета
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+SKY_BLUE = (135, 206, 235)
+
+# Биты ввода игрока (одно целое число на тик)
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+
+# События симуляции, на которые реагирует фронтенд (звук и т.д.)
+EVENT_COIN = "coin"
+EVENT_GAME_OVER = "game_over"
+EVENT_CHECKPOINT = "checkpoint"
@@ -0,0 +1,49 @@
+import os
+import wave
+
+import pygame
+
+# Папка с заранее раскодированными звуками
+SOUND_CACHE = ".cache/sounds"
+
+
+# Имя файла в кэше: зависит от исходного файла и формата микшера,
+# поэтому измененный MP3 или другой формат вывода дают новый файл
+def cache_name(path, mixer_format):
+    stat = os.stat(path)
+    frequency, size, channels = mixer_format
+    base = os.path.splitext(os.path.basename(path))[0]
+    return f"{base}-{stat.st_size}-{int(stat.st_mtime)}-{frequency}-{size}-{channels}.wav"
+
+
+# Запись PCM звука в WAV: сначала во временный файл, затем атомарная
+# замена, чтобы второй экземпляр игры не прочитал недописанный файл
+def write_wav(path, sound, mixer_format):
+    frequency, size, channels = mixer_format
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with wave.open(tmp, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(frequency)
+        f.writeframes(sound.get_raw())
+    os.replace(tmp, path)
+
+
+# Короткий звук. При первом запуске MP3 раскодируется и сохраняется
+# как WAV в формате микшера; следующие запуски читают WAV без декодирования.
+def load_sound(path, volume, cache_dir=SOUND_CACHE):
+    mixer_format = pygame.mixer.get_init()
+    cached = os.path.join(cache_dir, cache_name(path, mixer_format))
+    if os.path.exists(cached):
+        sound = pygame.mixer.Sound(cached)
+    else:
+        sound = pygame.mixer.Sound(path)
+        # WAV хранит знаковые 16 бит; другие форматы микшера не кэшируются
+        if mixer_format[1] == -16:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                write_wav(cached, sound, mixer_format)
+            except OSError:
+                pass  # Нет прав на запись — просто декодируем каждый раз
+    sound.set_volume(volume)
+    return sound
@@ -0,0 +1,76 @@
+import pygame
+
+# Высота горизонтальной полосы индекса в пикселях
+BAND_HEIGHT = 100
+
+
+# Пространственный индекс по горизонтальным полосам. Уровень узкий
+# (800 пикселей) и вытянут вверх, поэтому сетки по Y достаточно:
+# запрос проверяет только объекты из полос, которые он пересекает.
+# Объект попадает в индекс через insert и сам удаляется из него
+# при kill() (см. world.Entity).
+class BandIndex:
+    def __init__(self, band_height=BAND_HEIGHT):
+        self.band_height = band_height
+        self.bands = {}  # номер полосы -> {объект: None} (словарь сохраняет порядок)
+        self.spans = {}  # объект -> (первая полоса, последняя полоса)
+
+    def __len__(self):
+        return len(self.spans)
+
+    def __iter__(self):
+        return iter(self.spans)
+
+    def _span(self, rect):
+        return rect.top // self.band_height, (rect.bottom - 1) // self.band_height
+
+    def insert(self, item):
+        span = self._span(item.rect)
+        self.spans[item] = span
+        for band in range(span[0], span[1] + 1):
+            self.bands.setdefault(band, {})[item] = None
+        item.index = self
+
+    def remove(self, item):
+        span = self.spans.pop(item, None)
+        if span is None:
+            return
+        for band in range(span[0], span[1] + 1):
+            members = self.bands[band]
+            del members[item]
+            if not members:
+                del self.bands[band]
+        item.index = None
+
+    def query(self, rect):
+        first, last = self._span(rect)
+        found = []
+        for band in range(first, last + 1):
+            members = self.bands.get(band)
+            if not members:
+                continue
+            for item in members:
+                if item.rect.colliderect(rect) and (first == last or item not in found):
+                    found.append(item)
+        return found
+
+    def any(self, rect):
+        first, last = self._span(rect)
+        for band in range(first, last + 1):
+            for item in self.bands.get(band, ()):
+                if item.rect.colliderect(rect):
+                    return True
+        return False
+
+    # Непрерывная проверка падения: rect — положение после шага,
+    # prev_bottom — нижний край до шага. Возвращает самый верхний
+    # объект, который задевает вся пройденная за тик полоса, чтобы
+    # быстрое падение не проскакивало тонкие платформы.
+    def sweep_down(self, rect, prev_bottom):
+        top = min(rect.top, prev_bottom - rect.height)
+        swept = pygame.Rect(rect.x, top, rect.width, rect.bottom - top)
+        best = None
+        for item in self.query(swept):
+            if best is None or item.rect.top < best.rect.top:
+                best = item
+        return best
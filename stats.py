@@ -0,0 +1,210 @@
+import argparse
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+# База рекордов и статистики забегов (SQLite в режиме WAL: читатели не
+# ждут писателя, а несколько копий игры пишут в одну базу по очереди)
+STATS_PATH = "scores.db"
+
+# Файл рекорда прежних версий: переносится в базу при ее создании
+LEGACY_HIGHSCORE = "highscore.txt"
+
+# Сколько секунд писатель ждет, пока базу держит другая копия игры
+BUSY_TIMEOUT = 30.0
+
+# Сколько при выходе ждать, пока фоновый поток допишет очередь
+CLOSE_TIMEOUT = 2.0
+
+# Столбцы забега (в порядке вставки)
+COLUMNS = (
+    "finished_at",  # Время конца забега (Unix)
+    "seed",
+    "score",
+    "height",  # Наибольшая высота подъема в пикселях
+    "coins",
+    "death",  # "enemy", "fall" или NULL для перенесенного рекорда
+    "ticks",
+    "duration_s",  # Длина забега в секундах игрового времени
+    "frame_p50_ms",  # Время кадра: медиана и хвосты
+    "frame_p95_ms",
+    "frame_p99_ms",
+    "resolution",  # Разрешение кадра и способ вывода
+)
+
+SCHEMA = """
+CREATE TABLE runs (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    seed INTEGER,
+    score INTEGER NOT NULL,
+    height INTEGER,
+    coins INTEGER,
+    death TEXT,
+    ticks INTEGER,
+    duration_s REAL,
+    frame_p50_ms REAL,
+    frame_p95_ms REAL,
+    frame_p99_ms REAL,
+    resolution TEXT
+)
+"""
+
+INSERT = f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+# Старый рекорд из highscore.txt или None
+def read_legacy(path=LEGACY_HIGHSCORE):
+    try:
+        with open(path) as f:
+            return int(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as error:
+        print(f"stats: {path} не прочитан: {error}", file=sys.stderr)
+        return None
+
+
+def has_runs_table(db):
+    return db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'runs'").fetchone() is not None
+
+
+# Соединение с базой. Таблица создается (и старый рекорд переносится)
+# внутри BEGIN IMMEDIATE, поэтому две копии игры не сделают это дважды;
+# у готовой базы соединение блокировок не берет.
+def connect(path=STATS_PATH):
+    db = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+    try:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")  # В WAL транзакция все равно атомарна
+        if not has_runs_table(db):
+            db.execute("BEGIN IMMEDIATE")
+            if not has_runs_table(db):
+                db.execute(SCHEMA)
+                legacy = read_legacy()
+                if legacy is not None:
+                    db.execute("INSERT INTO runs (finished_at, score) VALUES (?, ?)", (time.time(), legacy))
+            db.commit()
+    except BaseException:
+        db.close()
+        raise
+    return db
+
+
+# Медиана и хвосты времени кадра в миллисекундах
+def frame_summary(times):
+    times = sorted(times)
+    if not times:
+        return {"frame_p50_ms": None, "frame_p95_ms": None, "frame_p99_ms": None}
+    return {
+        f"frame_p{p}_ms": round(times[min(len(times) - 1, len(times) * p // 100)], 3)
+        for p in (50, 95, 99)
+    }
+
+
+# Фоновая запись забегов. record() только кладет забег в очередь и
+# никогда не ждет диска; поток забирает из очереди все, что накопилось,
+# и пишет пачку одной транзакцией. Если запись не удалась (база занята
+# дольше BUSY_TIMEOUT, нет места), пачка остается и пишется со следующей.
+class StatsStore:
+    def __init__(self, path=STATS_PATH):
+        self.path = path
+        self.queue = queue.SimpleQueue()
+        self.written = 0  # Сколько забегов уже на диске
+        self.error = None  # Последняя ошибка записи
+        self.thread = threading.Thread(target=self._run, name="stats-writer", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    # run — словарь со столбцами COLUMNS (недостающие пишутся как NULL)
+    def record(self, run):
+        self.queue.put(run)
+
+    def _run(self):
+        db = None
+        pending = []
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            running = None not in batch
+            pending.extend(tuple(run.get(name) for name in COLUMNS) for run in batch if run is not None)
+            if not pending:
+                continue
+            try:
+                if db is None:
+                    db = connect(self.path)
+                with db:
+                    db.executemany(INSERT, pending)
+                self.written += len(pending)
+                pending = []
+            except sqlite3.Error as error:
+                self.error = error
+                print(f"stats: не записано забегов: {len(pending)}: {error}", file=sys.stderr)
+        if db is not None:
+            db.close()
+
+    # Дописать очередь и остановить поток; дольше timeout выход не ждет
+    def close(self, timeout=CLOSE_TIMEOUT):
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+
+# Лучший счет; без базы или при ошибке чтения — 0 (ошибка печатается)
+def best_score(path=STATS_PATH):
+    try:
+        db = connect(path)
+        try:
+            return db.execute("SELECT MAX(score) FROM runs").fetchone()[0] or 0
+        finally:
+            db.close()
+    except sqlite3.Error as error:
+        print(f"stats: рекорд не прочитан из {path}: {error}", file=sys.stderr)
+        return 0
+
+
+# Таблица рекордов: лучшие limit забегов
+def leaderboard(db, limit=10):
+    return db.execute(
+        "SELECT score, height, coins, death, ticks, finished_at FROM runs ORDER BY score DESC, id LIMIT ?",
+        (limit,),
+    ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Рекорды и статистика забегов Mario Parkour")
+    parser.add_argument("--db", default=STATS_PATH, help=f"файл базы (по умолчанию {STATS_PATH})")
+    parser.add_argument("--top", type=int, default=10, help="сколько лучших забегов показать")
+    args = parser.parse_args()
+
+    db = connect(args.db)
+    for place, (score, height, coins, death, ticks, finished_at) in enumerate(leaderboard(db, args.top), 1):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(finished_at))
+        print(f"{place:>3}. {score:>6}  height {height if height is not None else '-':>6}  "
+              f"coins {coins if coins is not None else '-':>3}  {death or '-':<5}  {when}")
+
+    # Сводка по записанным забегам (без перенесенного рекорда)
+    count, mean_score = db.execute("SELECT COUNT(*), AVG(score) FROM runs WHERE death IS NOT NULL").fetchone()
+    if count:
+        deaths = dict(db.execute("SELECT death, COUNT(*) FROM runs WHERE death IS NOT NULL GROUP BY death"))
+        print(f"runs {count}  score mean {mean_score:.0f}  "
+              + "  ".join(f"{death} {n / count:.0%}" for death, n in sorted(deaths.items())))
+        for resolution, p50, p99 in db.execute(
+            "SELECT resolution, AVG(frame_p50_ms), MAX(frame_p99_ms) FROM runs"
+            " WHERE resolution IS NOT NULL GROUP BY resolution"
+        ):
+            print(f"    {resolution}: frame p50 mean {p50:.2f} ms, worst p99 {p99:.2f} ms")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
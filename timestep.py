@@ -0,0 +1,53 @@
+import time
+
+from settings import TICK_RATE
+
+# Сколько шагов симуляции можно догнать за один кадр
+MAX_CATCH_UP_STEPS = 5
+
+
+# Фиксированный шаг симуляции при произвольной частоте кадров.
+# Реальное время копится в аккумуляторе и расходуется целыми тиками;
+# остаток (alpha) используется для интерполяции позиций при отрисовке.
+# Если машина подвисла, за кадр выполняется не больше max_steps шагов,
+# а лишнее время отбрасывается, чтобы не уйти в «спираль смерти».
+class FixedTimestep:
+    def __init__(self, rate=TICK_RATE, max_steps=MAX_CATCH_UP_STEPS, clock=time.perf_counter):
+        self.dt = 1.0 / rate
+        self.max_steps = max_steps
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last = None
+        self.frames = 0  # Отрисованные кадры
+        self.steps = 0  # Выполненные шаги симуляции
+        self.merged_frames = 0  # Кадры, в которые пришлось сделать несколько шагов
+        self.dropped_steps = 0  # Шаги, отброшенные из-за лимита догонки
+
+    # Сброс после паузы или меню, чтобы не догонять время простоя
+    def reset(self):
+        self.accumulator = 0.0
+        self.last = None
+
+    # Сколько шагов симуляции выполнить в этом кадре
+    def advance(self):
+        now = self.clock()
+        if self.last is None:
+            self.last = now - self.dt  # Первый кадр — ровно один шаг
+        self.accumulator += now - self.last
+        self.last = now
+
+        steps = int(self.accumulator / self.dt)
+        self.accumulator -= steps * self.dt
+        if steps > self.max_steps:
+            self.dropped_steps += steps - self.max_steps
+            steps = self.max_steps
+        if steps > 1:
+            self.merged_frames += 1
+        self.frames += 1
+        self.steps += steps
+        return steps
+
+    # Доля следующего шага, прошедшая с последнего шага симуляции
+    @property
+    def alpha(self):
+        return self.accumulator / self.dt
@@ -0,0 +1,498 @@
+import random
+from collections import deque
+
+import pygame
+
+from camera import Camera
+from entities import CoinArrays, EnemyArrays
+from level import (
+    TILE, GRAVITY, JUMP_POWER, PLAYER_SPEED, LEVEL_PARAMS, LEVEL_VERSION, CHUNK_HEIGHT,
+    LevelStream,
+)
+from pools import EntityPools
+from profiler import NULL_PROFILER
+from spatial import BandIndex
+
+from settings import (
+    WIDTH, HEIGHT, TICK_RATE,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP,
+    EVENT_COIN, EVENT_GAME_OVER, EVENT_CHECKPOINT,
+)
+
+# Задержка анимации в тиках симуляции (100 мс при 60 тиках в секунду)
+ANIM_DELAY_TICKS = 100 * TICK_RATE // 1000
+
+# Насколько выше верхнего края экрана уровень разложен заранее и
+# сколько платформ добавляется за тик, пока запас не набран
+LOOKAHEAD = HEIGHT
+PLATFORMS_PER_TICK = 1
+
+# Хранение монеток и врагов: спрайты или массивы NumPy (entities.py)
+ENTITY_STORES = ("sprites", "arrays")
+
+
+# Параметры, от которых зависит уровень и физика; пишутся в записи
+# забегов, чтобы заметить, что запись сделана на другой версии игры
+def generator_params(params=None):
+    return {
+        "tick_rate": TICK_RATE,
+        "tile": TILE,
+        "gravity": GRAVITY,
+        "jump_power": JUMP_POWER,
+        "player_speed": PLAYER_SPEED,
+        "generator": LEVEL_VERSION,
+        "chunk_height": CHUNK_HEIGHT,
+        **LEVEL_PARAMS,
+        **(params or {}),
+    }
+
+
+# Заглушки текстур для безголового режима: важен только размер
+def placeholder_textures():
+    tile = pygame.Surface((TILE, TILE))
+    coin = pygame.Surface((20, 20))
+    return {
+        "block": tile,
+        "idle": [tile],
+        "right": [tile],
+        "left": [tile],
+        "jump_idle": [tile],
+        "jump_move": [tile],
+        "jump_move_left": [tile],
+        "enemy": tile,
+        "enemy_left": tile,
+        "coin": coin,
+    }
+
+
+# Базовый класс объектов мира: точная позиция хранится во float
+# в мировых координатах, а rect — ее округление для столкновений
+class Entity(pygame.sprite.Sprite):
+    index = None  # Пространственный индекс, в котором лежит объект
+    pool = None  # Пул, в который объект возвращается после удаления
+
+    def kill(self):
+        if self.index is not None:
+            self.index.remove(self)
+        super().kill()
+
+    def place(self, x, y):
+        self.x = self.prev_x = float(x)
+        self.y = self.prev_y = float(y)
+        self.rect.topleft = (self.x, self.y)
+
+    def sync_rect(self):
+        self.rect.topleft = (self.x, self.y)
+
+
+# Класс игрока
+class Player(Entity):
+    def __init__(self, textures):
+        super().__init__()
+        self.animations = {
+            "idle": textures["idle"],
+            "right": textures["right"],
+            "left": textures["left"],
+            "jump_idle": textures["jump_idle"],  # Прыжок на месте
+            "jump_move": textures["jump_move"],  # Прыжок в движении,
+            "jump_move_left": textures["jump_move_left"],  # Отзеркаленный заранее
+        }
+        self.reset()
+
+    # Возврат в начальное состояние для нового забега
+    def reset(self):
+        self.current_anim = "idle"
+        self.anim_index = 0
+        self.image = self.animations[self.current_anim][self.anim_index]
+        self.rect = self.image.get_rect()
+        self.rect.center = (WIDTH // 2, HEIGHT - 100)
+        self.place(self.rect.x, self.rect.y)
+        self.vel_y = 0
+        self.vel_x = 0
+        self.on_ground = False
+        self.jump_power = JUMP_POWER
+        self.speed = PLAYER_SPEED
+        self.gravity = GRAVITY
+        self.score = 0
+        self.ticks = 0  # Счетчик тиков вместо системного времени
+        self.last_update = 0
+        self.anim_delay = ANIM_DELAY_TICKS
+        self.is_jumping = False  # Флаг для отслеживания прыжка
+        self.facing_left = False  # Направление взгляда игрока (влево/вправо)
+
+    def update(self):
+        self.prev_x, self.prev_y = self.x, self.y  # Для интерполяции при отрисовке
+        self.ticks += 1
+        # Обновление анимации
+        if self.ticks - self.last_update > self.anim_delay:
+            self.last_update = self.ticks
+            if not self.is_jumping:  # Обновляем анимацию только если не в прыжке
+                self.anim_index = (self.anim_index + 1) % len(self.animations[self.current_anim])
+                self.image = self.animations[self.current_anim][self.anim_index]
+
+        # Гравитация
+        self.vel_y += self.gravity
+        self.y += self.vel_y
+
+        # Движение по горизонтали
+        self.x += self.vel_x
+
+        # Определение направления анимации
+        if self.is_jumping:
+            if self.vel_x == 0:  # Прыжок на месте
+                self.current_anim = "jump_idle"
+                self.image = self.animations["jump_idle"][0]
+            elif self.vel_x > 0:  # Прыжок в движении
+                self.current_anim = "jump_move"
+                self.image = self.animations["jump_move"][0]
+            else:  # Прыжок влево: берем заранее отзеркаленный кадр
+                self.current_anim = "jump_move_left"
+                self.image = self.animations["jump_move_left"][0]
+        else:
+            if self.vel_x > 0:
+                self.current_anim = "right"
+                self.facing_left = False
+            elif self.vel_x < 0:
+                self.current_anim = "left"
+                self.facing_left = True
+            else:
+                self.current_anim = "idle"
+
+        # Ограничение на выход за границы экрана
+        if self.x < 0:
+            self.x = 0.0
+        if self.x + self.rect.width > WIDTH:
+            self.x = float(WIDTH - self.rect.width)
+        self.sync_rect()
+
+    # Приземление на верх платформы
+    def land(self, top):
+        self.y = float(top - self.rect.height)
+        self.sync_rect()
+        self.on_ground = True
+        self.vel_y = 0
+        self.check_ground()  # Проверка, находится ли игрок на земле
+
+    def jump(self):
+        if self.on_ground:
+            self.vel_y = self.jump_power
+            self.on_ground = False
+            self.is_jumping = True  # Устанавливаем флаг прыжка
+
+    def move_left(self):
+        self.vel_x = -self.speed
+
+    def move_right(self):
+        self.vel_x = self.speed
+
+    def stop(self):
+        self.vel_x = 0
+
+    def check_ground(self):
+        # Проверка, находится ли игрок на земле
+        if self.vel_y == 0 and self.on_ground:
+            self.is_jumping = False  # Сбрасываем флаг прыжка
+
+
+# Готовая поверхность платформы одной ширины, общая для всех платформ.
+# Кэш лежит в словаре текстур, поэтому переживает перезапуски мира.
+def platform_surface(textures, width, height=1):
+    cache = textures.setdefault("platforms", {})
+    surface = cache.get((width, height))
+    if surface is None:
+        block_texture = textures["block"]
+        surface = pygame.Surface((TILE * width, TILE * height))
+        for i in range(width):
+            for j in range(height):
+                surface.blit(block_texture, (i * TILE, j * TILE))
+        cache[(width, height)] = surface
+    return surface
+
+
+# Класс платформы
+class Platform(Entity):
+    def __init__(self, textures, x=0, y=0, width=3, height=1):
+        super().__init__()
+        self.textures = textures
+        self.reset(x, y, width, height)
+
+    def reset(self, x, y, width=3, height=1):
+        self.width = width
+        self.height = height
+        self.image = platform_surface(self.textures, width, height)
+        self.rect = self.image.get_rect()
+        self.place(x, y)
+
+
+# Класс врага
+class Enemy(Entity):
+    def __init__(self, textures, x=0, y=0, vel_x=3):
+        super().__init__()
+        self.texture = textures["enemy"]  # Используем текстуру для врага
+        self.texture_left = textures["enemy_left"]  # И ее отзеркаленную копию
+        self.rect = self.texture.get_rect()
+        self.reset(x, y, vel_x)
+
+    def reset(self, x, y, vel_x):
+        self.image = self.texture
+        self.place(x, y)
+        self.vel_x = vel_x
+        self.flipped = True  # Флаг для отражения текстуры
+
+    def update(self):
+        self.prev_x = self.x
+        self.x += self.vel_x
+        self.sync_rect()
+
+        # Смена текстуры при изменении направления
+        if self.vel_x > 0 and not self.flipped:
+            self.image = self.texture
+            self.flipped = True
+        elif self.vel_x < 0 and self.flipped:
+            self.image = self.texture_left
+            self.flipped = False
+
+        # Ограничение на выход за границы экрана
+        if self.rect.left < 0 or self.rect.right > WIDTH:
+            self.vel_x *= -1
+
+
+# Класс монетки
+class Coin(Entity):
+    def __init__(self, textures, x=0, y=0):
+        super().__init__()
+        self.image = textures["coin"]
+        self.rect = self.image.get_rect()
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        self.place(x - self.rect.width // 2, y - self.rect.height // 2)
+
+    def update(self):
+        pass
+
+
+# Симуляция игры без отрисовки, звука и системного времени.
+# Весь случайный выбор идет через собственный генератор с сидом,
+# а время измеряется тиками, поэтому прогон воспроизводим и может
+# идти быстрее реального времени. С entities="arrays" монетки и враги
+# хранятся в массивах и обрабатываются векторно, а результат каждого
+# тика тот же, что и со спрайтами.
+class GameWorld:
+    def __init__(self, seed=None, textures=None, entities="sprites", params=None):
+        self.textures = textures if textures is not None else placeholder_textures()
+        self.params = {**LEVEL_PARAMS, **(params or {})}  # Параметры генерации уровня
+        self.pools = EntityPools(
+            lambda: Platform(self.textures),
+            lambda: Coin(self.textures),
+            lambda: Enemy(self.textures),
+        )
+
+        # Монетки и враги в массивах: acquire() хранилища заменяет пул
+        self.stores = ()
+        if entities == "arrays":
+            self.pools.coins = self.coin_store = CoinArrays(self.textures)
+            self.pools.enemies = self.enemy_store = EnemyArrays(self.textures)
+            self.stores = (self.coin_store, self.enemy_store)
+
+        # Группы спрайтов и индексы живут между перезапусками
+        self.all_sprites = pygame.sprite.Group()
+        self.platforms = pygame.sprite.Group()
+        self.enemies = pygame.sprite.Group()
+        self.coins = pygame.sprite.Group()  # Группа для монеток
+
+        # Пространственные индексы для столкновений
+        self.platform_index = BandIndex()
+        self.coin_index = BandIndex()
+        self.enemy_index = BandIndex()
+
+        # Объекты уровня в порядке убывания мировой y (снизу вверх):
+        # удаление ушедших вниз — это проверка только начала очереди
+        self.scenery = deque()
+
+        self.player = Player(self.textures)
+        self.profiler = NULL_PROFILER  # Замер фаз шага (см. profiler.py)
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.game_over = False
+        self.death = None  # Причина проигрыша: "enemy" или "fall"
+        self.coins_collected = 0
+        self.camera = Camera()
+
+        # Все объекты прошлого забега возвращаются в пулы
+        while self.scenery:
+            self.despawn(self.scenery.popleft())
+        for store in self.stores:
+            store.clear()
+
+        # Игрок
+        self.player.reset()
+        self.all_sprites.add(self.player)
+        self.start_y = self.peak_y = self.player.y  # Для высоты подъема
+
+        # Уровень по чанкам (level.py); стартовая платформа под игроком —
+        # первая в чанке 0. Первый экран и запас над ним — сразу.
+        self.level = LevelStream(seed, self.params)
+        self.stream_level(None)
+
+    @property
+    def score(self):
+        return self.player.score
+
+    # Наибольшая высота подъема за забег в пикселях
+    @property
+    def height(self):
+        return round(self.start_y - self.peak_y)
+
+    # Один тик симуляции; inputs — битовая маска INPUT_*.
+    # Возвращает список событий EVENT_* этого тика.
+    def step(self, inputs):
+        events = []
+        if self.game_over:
+            return events
+
+        self.tick += 1
+        player = self.player
+
+        # Управление игроком
+        if inputs & INPUT_LEFT:
+            player.move_left()
+        elif inputs & INPUT_RIGHT:
+            player.move_right()
+        else:
+            player.stop()
+
+        if inputs & INPUT_JUMP:
+            player.jump()
+
+        # Обновление спрайтов (враги движутся только по X,
+        # поэтому их полосы в индексе не меняются)
+        prev_bottom = player.rect.bottom
+        self.all_sprites.update()
+        if self.stores:
+            self.enemy_store.update()
+        self.profiler.mark("update")
+
+        # Проверка столкновений игрока с платформами: берется самая
+        # верхняя платформа на всем пути падения за тик
+        if player.vel_y > 0:  # Если игрок падает
+            hit = self.platform_index.sweep_down(player.rect, prev_bottom)
+            if hit is not None:
+                player.land(hit.rect.top)
+
+        # Проверка столкновений с монетками
+        if self.stores:
+            coins_collected = self.coin_store.collect(player.rect)
+        else:
+            coins_collected = self.coin_index.query(player.rect)
+            for coin in coins_collected:
+                coin.kill()
+        if coins_collected:
+            player.score += self.rng.randint(10, 100)  # Добавляем очки за монетки
+            self.coins_collected += coins_collected if self.stores else len(coins_collected)
+            events.append(EVENT_COIN)
+
+        # Проверка столкновений с врагами
+        enemies = self.enemy_store if self.stores else self.enemy_index
+        if enemies.any(player.rect):
+            self.game_over = True
+            self.death = "enemy"
+
+        # Проверка на проигрыш (падение за экран)
+        camera = self.camera
+        if player.rect.top > camera.cutoff:
+            self.game_over = True
+            self.death = "fall"
+
+        if self.game_over:
+            events.append(EVENT_GAME_OVER)
+        self.profiler.mark("collide")
+
+        if player.y < self.peak_y:
+            self.peak_y = player.y
+
+        # Движение камеры вверх
+        if camera.follow(player.y):
+            player.score += 1
+
+        # Удаление объектов, ушедших за нижний край экрана
+        scenery = self.scenery
+        cutoff = camera.cutoff
+        while scenery and scenery[0].rect.top > cutoff:
+            self.despawn(scenery.popleft())
+        for store in self.stores:
+            store.despawn(cutoff)
+
+        # Проверка на каждую тысячу
+        if player.score % 1000 == 0 and player.score != 0:
+            events.append(EVENT_CHECKPOINT)
+
+        # Достройка уровня над камерой понемногу каждый тик
+        self.stream_level(PLATFORMS_PER_TICK)
+        self.profiler.mark("spawn")
+
+        return events
+
+    # Платформы из потока чанков, пока уровень не разложен на LOOKAHEAD
+    # выше экрана, но не больше limit за вызов (None — без ограничения).
+    # Раскладка зависит только от сида, а объекты появляются заранее,
+    # поэтому камера никогда не догоняет край уровня.
+    def stream_level(self, limit=PLATFORMS_PER_TICK):
+        level = self.level
+        pools = self.pools
+        added = 0
+        while level.top > self.camera.y - LOOKAHEAD and (limit is None or added < limit):
+            x, y, width, coin_x, enemy_vel = next(level)
+            platform = pools.platforms.acquire(x, y, width)
+            coins = [pools.coins.acquire(coin_x, y - 20)] if coin_x is not None else []
+            enemies = [pools.enemies.acquire(x + 30, y - 50, enemy_vel)] if enemy_vel is not None else []
+            self.add_scenery([platform], coins, enemies)
+            added += 1
+
+    # Регистрация новой партии объектов. Партия целиком выше
+    # предыдущих, поэтому сортировки внутри нее достаточно, чтобы
+    # очередь scenery оставалась упорядоченной по высоте.
+    def add_scenery(self, platforms, coins, enemies):
+        if self.stores:
+            coins = enemies = []  # Уже лежат в массивах после acquire()
+        self.all_sprites.add(platforms, coins, enemies)
+        self.platforms.add(platforms)
+        self.coins.add(coins)
+        self.enemies.add(enemies)
+        for platform in platforms:
+            self.platform_index.insert(platform)
+        for coin in coins:
+            self.coin_index.insert(coin)
+        for enemy in enemies:
+            self.enemy_index.insert(enemy)
+        batch = platforms + coins + enemies
+        batch.sort(key=lambda sprite: sprite.rect.top, reverse=True)
+        self.scenery.extend(batch)
+
+    # Удаление объекта из мира с возвратом в пул. Собранные монетки
+    # уже убраны из групп, но в пул попадают только отсюда, чтобы
+    # объект не оказался в очереди scenery дважды.
+    def despawn(self, sprite):
+        sprite.kill()
+        if sprite.pool is not None:
+            sprite.pool.release(sprite)
+
+    # Число монеток и врагов в мире при любом способе хранения
+    @property
+    def coin_count(self):
+        return len(self.coin_store) if self.stores else len(self.coins)
+
+    @property
+    def enemy_count(self):
+        return len(self.enemy_store) if self.stores else len(self.enemies)
+
+    # Сколько объектов и поверхностей было создано за все время
+    @property
+    def allocations(self):
+        return self.pools.created + len(self.textures.get("platforms", ()))